@@ -3,10 +3,15 @@ import streamlit as st
 import json
 import PIL.Image
 import io
+import os
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from gemini.extract import extract_metadata, extract_monthly, extract_totals
 from gemini.clean import clean_gemini_json, clean_totals_json
 from gemini.plot import generate_plot
+from gemini import metrics
+from gemini.speculate import Budget, SpeculativeExtractor, content_key
+from gemini import export
 # from streamlit_image_comparison import image_comparison
 
 # --- Page config ---
@@ -47,6 +52,20 @@ with st.sidebar:
     st.subheader("Processing Options")
     model_choice = st.selectbox("OCR Model", ["Gemini 2.5-Flash-Preview-09-2025"], index=0)
     validate_image = st.checkbox("Validate image size/quality", value=True)
+    show_metrics = st.checkbox("Show timing breakdown", value=metrics.is_enabled())
+    # per-session run: this checkbox and the breakdown only affect this session
+    if "metrics_run" not in st.session_state:
+        st.session_state.metrics_run = metrics.Run(enabled=show_metrics)
+    st.session_state.metrics_run.enabled = show_metrics
+    metrics.activate(st.session_state.metrics_run)
+    speculative = st.checkbox(
+        "Speculative extraction",
+        value=False,
+        help="Start extracting in the background as soon as an image is uploaded or an example is selected.",
+    )
+    spec_budget = st.number_input(
+        "Speculation budget (pages)", min_value=0, max_value=100, value=10, disabled=not speculative
+    )
 
     st.markdown("---")
     st.subheader("Example Images")
@@ -86,8 +105,14 @@ with st.sidebar:
 # --- Helper utilities ---
 @st.cache_data(ttl=3600)
 def load_image(file) -> PIL.Image.Image:
-    file.seek(0)
-    img = PIL.Image.open(file).convert("RGB")
+    # file: uploaded file or path of an example image
+    if hasattr(file, "seek"):
+        file.seek(0)
+    with metrics.span(metrics.IMAGE_LOAD):
+        img = PIL.Image.open(file)
+        img.load()
+    with metrics.span(metrics.PREPROCESS):
+        img = img.convert("RGB")
     return img
 
 def validate(img: PIL.Image.Image):
@@ -102,24 +127,98 @@ def make_downloadable_json(obj) -> bytes:
     # return raw bytes for st.download_button
     return json.dumps(obj, indent=2).encode("utf-8")
 
+# pages all sessions of this server may speculate on together (one API key)
+SPECULATION_BUDGET = int(os.getenv("RAINFALL_SPEC_BUDGET", "50"))
+
+@st.cache_resource
+def get_speculation_shared():
+    # one pool + one budget per process: no per-session threads left behind
+    # when a session ends, and new sessions can't reset the quota cap
+    pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="speculate")
+    return pool, Budget(SPECULATION_BUDGET)
+
+@st.cache_resource
+def get_export_cache() -> export.ExportCache:
+    # shared across sessions; entries are keyed by content hash
+    return export.ExportCache(max_entries=64)
+
+@st.cache_data(ttl=3600)
+def file_key(path):
+    # content hash of a local example image (None if missing)
+    try:
+        with open(path, "rb") as f:
+            return content_key(f.read())
+    except OSError:
+        return None
+
+def open_rgb(data):
+    # loader run in the speculation worker thread (no st.* calls there)
+    return lambda: PIL.Image.open(io.BytesIO(data) if isinstance(data, bytes) else data).convert("RGB")
+
 # --- Ensure session state keys ---
 if "ready" not in st.session_state:
     st.session_state.ready = False
 if "uploaded_name" not in st.session_state:
     st.session_state.uploaded_name = None
 
-# If a new upload occurs, reset previous results
-if uploaded:
+# Without an upload, the selected example (if present locally) is the source
+example_path = example_images[st.session_state.idx]
+use_example = not uploaded and os.path.exists(example_path)
+source = uploaded if uploaded else (example_path if use_example else None)
+
+# If a new upload (or another example) occurs, reset previous results
+if source is not None:
     # compare name & size to decide if new
-    uploaded_identifier = f"{uploaded.name}-{uploaded.size}"
+    uploaded_identifier = f"{uploaded.name}-{uploaded.size}" if uploaded else f"example-{example_path}"
     if st.session_state.uploaded_name != uploaded_identifier:
         # new file uploaded -> clear previous
         st.session_state.uploaded_name = uploaded_identifier
         st.session_state.ready = False
-        for k in ("metadata", "monthly", "totals", "buf"):
+        metrics.start_run()
+        for k in ("metadata", "monthly", "totals", "buf", "page_key"):
             if k in st.session_state:
                 del st.session_state[k]
 
+# --- Speculative extraction: start in background, cancel what is no longer wanted ---
+source_key = None
+if speculative:
+    pool, shared_budget = get_speculation_shared()
+    # the session's counter outlives the speculator: unticking/reticking doesn't reset it
+    if "speculation_budget" not in st.session_state:
+        st.session_state.speculation_budget = Budget(spec_budget, parent=shared_budget)
+    st.session_state.speculation_budget.limit = spec_budget
+    if "speculator" not in st.session_state:
+        st.session_state.speculator = SpeculativeExtractor(
+            budget=st.session_state.speculation_budget, pool=pool
+        )
+    speculator = st.session_state.speculator
+
+    wanted = []  # (key, loader), most important first
+    if uploaded:
+        # only the upload: example jobs would hold the workers ahead of it
+        data = uploaded.getvalue()
+        wanted.append((content_key(data), open_rgb(data)))
+    else:
+        # selected example and its carousel neighbours (pre-warm)
+        n = len(example_images)
+        for offset in (0, 1, -1):
+            path = example_images[(st.session_state.idx + offset) % n]
+            key = file_key(path)
+            if key is not None:
+                wanted.append((key, open_rgb(path)))
+
+    if uploaded:
+        source_key = wanted[0][0]
+    elif use_example:
+        source_key = file_key(example_path)
+
+    speculator.retain([k for k, _ in wanted])
+    for key, loader in wanted:
+        speculator.submit(key, loader)
+elif "speculator" in st.session_state:
+    st.session_state.speculator.shutdown()
+    del st.session_state["speculator"]
+
 # Add space before the right column
 st.markdown("<br>", unsafe_allow_html=True)
 
@@ -128,9 +227,11 @@ col_left, col_right = st.columns([1, 2])
 
 with col_left:
     st.subheader("Preview")
-    if uploaded:
-        img = load_image(uploaded)
+    if source is not None:
+        img = load_image(source)
         st.image(img, width=400)
+        if use_example:
+            st.caption(f"Example: {os.path.basename(example_path)}")
 
         if validate_image:
             msgs = validate(img)
@@ -141,6 +242,17 @@ with col_left:
                 st.success("Gambar memenuhi ukuran minimal.")
 
         process_btn = st.button("Process Image", type="primary")
+        if source_key is not None:
+            speculator = st.session_state.speculator
+            status = speculator.status(source_key)
+            error = speculator.error(source_key)
+            if error is not None:
+                # failures are not retried in the background; the button runs the normal path
+                status = f"failed ({type(error).__name__}: {error})"
+            st.caption(
+                f"Background extraction: {status} "
+                f"({speculator.remaining} pages of budget left)"
+            )
     else:
         st.info("Silakan upload gambar di sidebar untuk memulai.")
         process_btn = False
@@ -152,53 +264,79 @@ with col_right:
     st.subheader("Results")
 
     # Processing block - saves outputs to session_state
-    if process_btn and uploaded:
+    if process_btn and source is not None:
         progress_text = st.empty()
         progress_bar = st.progress(0)
-
-        try:
-            # 1) Extract
-            progress_text.info("1/4 — Extracting metadata...")
-            progress_bar.progress(10)
-            metadata_raw = extract_metadata(img)  # returns JSON string or similar
-
-            progress_text.info("2/4 — Extracting monthly table...")
-            progress_bar.progress(30)
-            monthly_raw = extract_monthly(img)
-
-            progress_text.info("3/4 — Extracting totals...")
-            progress_bar.progress(50)
-            totals_raw = extract_totals(img)
-
-            # 2) Clean
-            progress_text.info("4/4 — Cleaning extracted data...")
-            progress_bar.progress(70)
-            metadata = json.loads(metadata_raw)
-            monthly = clean_gemini_json(json.loads(monthly_raw))
-            totals = clean_totals_json(json.loads(totals_raw), monthly)
-
-            progress_bar.progress(85)
-
-            # Plot generation (matplotlib fig)
-            fig = generate_plot(img, metadata, monthly, totals)
-            buf = io.BytesIO()
-            fig.savefig(buf, format="png", dpi=200, bbox_inches="tight")
-            buf.seek(0)
-
-            # store into session_state so results persist after rerun
-            st.session_state.metadata = metadata
-            st.session_state.monthly = monthly
-            st.session_state.totals = totals
-            st.session_state.buf = buf  # BytesIO
+        # keep the (cached) image load/preprocess timings of this upload
+        metrics.start_run(keep=(metrics.IMAGE_LOAD, metrics.PREPROCESS))
+        # new results -> new export cache key
+        st.session_state.pop("page_key", None)
+
+        # speculative hit: waits for a running job, None if missing/failed/not started
+        result = None
+        if source_key is not None:
+            progress_text.info("Using background extraction...")
+            result = st.session_state.speculator.result(source_key)
+
+        if result is not None:
+            # timings of the job that produced this page (not of other prefetches)
+            metrics.current_run().extend(result["spans"])
+            st.session_state.metadata = result["metadata"]
+            st.session_state.monthly = result["monthly"]
+            st.session_state.totals = result["totals"]
+            st.session_state.buf = io.BytesIO(result["png"])
             st.session_state.ready = True
-
             progress_bar.progress(100)
             progress_text.success("Selesai")
 
-        except Exception as e:
-            st.exception(e)
-            progress_text.error("Terjadi kesalahan saat memproses gambar.")
-            progress_bar.empty()
+        else:
+            try:
+                # 1) Extract
+                progress_text.info("1/4 — Extracting metadata...")
+                progress_bar.progress(10)
+                metadata_raw = extract_metadata(img)  # returns JSON string or similar
+
+                progress_text.info("2/4 — Extracting monthly table...")
+                progress_bar.progress(30)
+                monthly_raw = extract_monthly(img)
+
+                progress_text.info("3/4 — Extracting totals...")
+                progress_bar.progress(50)
+                totals_raw = extract_totals(img)
+
+                # 2) Clean
+                progress_text.info("4/4 — Cleaning extracted data...")
+                progress_bar.progress(70)
+                metadata = json.loads(metadata_raw)
+                with metrics.span(metrics.CLEAN_MONTHLY):
+                    monthly = clean_gemini_json(json.loads(monthly_raw))
+                with metrics.span(metrics.CLEAN_TOTALS):
+                    totals = clean_totals_json(json.loads(totals_raw), monthly)
+
+                progress_bar.progress(85)
+
+                # Plot generation (matplotlib fig)
+                with metrics.span(metrics.RENDER):
+                    fig = generate_plot(img, metadata, monthly, totals)
+                buf = io.BytesIO()
+                with metrics.span(metrics.SAVEFIG):
+                    fig.savefig(buf, format="png", dpi=200, bbox_inches="tight")
+                buf.seek(0)
+
+                # store into session_state so results persist after rerun
+                st.session_state.metadata = metadata
+                st.session_state.monthly = monthly
+                st.session_state.totals = totals
+                st.session_state.buf = buf  # BytesIO
+                st.session_state.ready = True
+
+                progress_bar.progress(100)
+                progress_text.success("Selesai")
+
+            except Exception as e:
+                st.exception(e)
+                progress_text.error("Terjadi kesalahan saat memproses gambar.")
+                progress_bar.empty()
 
     # === Persistent results view (tabs) ===
     if st.session_state.get("ready"):
@@ -231,11 +369,32 @@ with col_right:
         with tab_downloads:
             st.markdown("Download your outputs below.")
             c1, c2, c3 = st.columns([1,1,1])
-            # Use raw bytes for downloads (so button works reliably)
-            json_monthly_bytes = make_downloadable_json(st.session_state.monthly)
-            json_totals_bytes = make_downloadable_json(st.session_state.totals)
             # image bytes
             img_bytes = st.session_state.buf.getvalue()
+            page_name = os.path.splitext(uploaded.name if uploaded else os.path.basename(example_path))[0]
+            # serialize once per result; reruns hit the content-hash cache
+            if "page_key" not in st.session_state:
+                # the cache is shared across sessions: key on everything that goes into the files
+                st.session_state.page_key = export.content_hash(
+                    img_bytes,
+                    page_name,
+                    *(
+                        json.dumps(st.session_state[k], sort_keys=True)
+                        for k in ("metadata", "monthly", "totals")
+                    ),
+                )
+            page_key = st.session_state.page_key
+            cache = get_export_cache()
+            page = {
+                "name": page_name,
+                "metadata": st.session_state.metadata,
+                "monthly": st.session_state.monthly,
+                "totals": st.session_state.totals,
+                "png": img_bytes,
+            }
+            # Use raw bytes for downloads (so button works reliably)
+            json_monthly_bytes = cache.get(page_key, "monthly", lambda: make_downloadable_json(page["monthly"]))
+            json_totals_bytes = cache.get(page_key, "totals", lambda: make_downloadable_json(page["totals"]))
 
             with c1:
                 st.download_button(
@@ -262,9 +421,63 @@ with col_right:
                     use_container_width=True
                 )
 
-    elif uploaded and not st.session_state.get("ready"):
+            c4, c5 = st.columns([1,1])
+            with c4:
+                st.download_button(
+                    "Download All (ZIP)",
+                    data=cache.get(page_key, "zip", lambda: export.zip_bytes([page], single=True)),
+                    file_name=f"{page_name}.zip",
+                    mime="application/zip",
+                    use_container_width=True
+                )
+            with c5:
+                st.download_button(
+                    "Download Table (CSV)",
+                    data=cache.get(page_key, "csv", lambda: export.csv_bytes([page])),
+                    file_name=f"{page_name}.csv",
+                    mime="text/csv",
+                    use_container_width=True
+                )
+
+    elif source is not None and not st.session_state.get("ready"):
         st.info("Tekan 'Process Image' setelah mengonfirmasi preview untuk mengekstrak data.")
 
+# --- Sidebar: last run timing breakdown (rendered last so it includes this run) ---
+if show_metrics:
+    with st.sidebar:
+        st.markdown("---")
+        st.subheader("Last Run Timing")
+        run = metrics.last_run()
+        if run:
+            rows = [
+                {
+                    "stage": e["stage"] + (f" ({e['label']})" if e["label"] else ""),
+                    "ms": round(e["seconds"] * 1000, 1),
+                    "prompt tok": e.get("prompt_tokens", ""),
+                    "output tok": e.get("output_tokens", ""),
+                    "retries": e.get("retries", ""),
+                }
+                for e in run
+            ]
+            st.table(rows)
+            st.caption(f"Total: {sum(e['seconds'] for e in run):.2f} s")
+            st.download_button(
+                "Metrics (Prometheus)",
+                data=metrics.to_prometheus().encode("utf-8"),
+                file_name="metrics.prom",
+                mime="text/plain",
+                use_container_width=True
+            )
+            st.download_button(
+                "Metrics (JSON)",
+                data=json.dumps(metrics.snapshot(), indent=2).encode("utf-8"),
+                file_name="metrics.json",
+                mime="application/json",
+                use_container_width=True
+            )
+        else:
+            st.caption("No run recorded yet.")
+
 # Footer
 st.markdown("---")
 st.caption(f"Generated: {datetime.utcnow().strftime('%Y-%m-%d %H:%M UTC')}")
@@ -0,0 +1 @@
+"""Offline benchmarks (fake Gemini server, synthetic fixtures)."""
@@ -0,0 +1,114 @@
+# benchmarks/bench_client.py
+"""
+Throughput benchmark AsyncExtractionClient terhadap fake server lokal.
+
+    python -m benchmarks.bench_client --pages 200 --latency 0.3 --error-rate 0.1
+
+Mencetak satu baris JSON: pages/s, latensi per halaman (p50/p95), retry,
+dan statistik server (berapa 429 yang disuntikkan).
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+
+from benchmarks.fake_gemini_server import FakeGeminiServer
+from gemini import metrics
+from gemini.client import AsyncExtractionClient, ExtractionError
+
+
+def _percentile(values, q):
+    if not values:
+        return None
+    values = sorted(values)
+    k = min(len(values) - 1, max(0, round(q * (len(values) - 1))))
+    return values[k]
+
+
+async def _run(args, server):
+    image = os.urandom(args.image_kb * 1024)
+    latencies, failures = [], 0
+    sem = asyncio.Semaphore(args.concurrency)
+
+    async with AsyncExtractionClient(
+        "fake-key",
+        base_url=server.url,
+        rpm=args.rpm,
+        tpm=args.tpm,
+        max_connections=args.connections,
+        max_retries=args.max_retries,
+        deadline=args.deadline,
+        backoff_base=args.backoff_base,
+    ) as client:
+
+        async def one_page():
+            nonlocal failures
+            async with sem:
+                t0 = time.perf_counter()
+                try:
+                    await client.extract_all(image)
+                    latencies.append(time.perf_counter() - t0)
+                except ExtractionError:
+                    failures += 1
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*(one_page() for _ in range(args.pages)))
+        elapsed = time.perf_counter() - t0
+
+    retries = sum(
+        c["value"] for c in metrics.snapshot()["counters"] if c["name"] == "retries"
+    )
+    return {
+        "benchmark": "client_throughput",
+        "pages": args.pages,
+        "ok": len(latencies),
+        "failed": failures,
+        "seconds": round(elapsed, 3),
+        "pages_per_s": round(len(latencies) / elapsed, 2) if elapsed else None,
+        "page_p50_s": _percentile(latencies, 0.5),
+        "page_p95_s": _percentile(latencies, 0.95),
+        "page_mean_s": statistics.fmean(latencies) if latencies else None,
+        "retries": retries,
+        "server": dict(server.stats),
+    }
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--pages", type=int, default=100)
+    p.add_argument("--concurrency", type=int, default=32, help="halaman paralel")
+    p.add_argument("--connections", type=int, default=16, help="ukuran connection pool")
+    p.add_argument("--latency", type=float, default=0.2)
+    p.add_argument("--jitter", type=float, default=0.1)
+    p.add_argument("--error-rate", type=float, default=0.05, help="peluang 429 acak")
+    p.add_argument("--server-rpm", type=int, default=None, help="kuota rpm di sisi server")
+    p.add_argument("--rpm", type=int, default=None, help="limiter rpm di sisi client")
+    p.add_argument("--tpm", type=int, default=None, help="limiter tpm di sisi client")
+    p.add_argument("--max-retries", type=int, default=5)
+    p.add_argument("--deadline", type=float, default=60.0)
+    p.add_argument("--backoff-base", type=float, default=0.05)
+    p.add_argument("--image-kb", type=int, default=200)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--output", help="tulis hasil JSON ke file ini")
+    args = p.parse_args(argv)
+
+    metrics.enable()
+    metrics.reset()
+    with FakeGeminiServer(
+        latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+        rpm=args.server_rpm, seed=args.seed,
+    ) as server:
+        result = asyncio.run(_run(args, server))
+
+    line = json.dumps(result)
+    print(line)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(line + "\n")
+    return result
+
+
+if __name__ == "__main__":
+    main()
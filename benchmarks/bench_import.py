@@ -0,0 +1,99 @@
+# benchmarks/bench_import.py
+"""
+Benchmark waktu import (startup) modul `gemini` di proses baru.
+
+    python -m benchmarks.bench_import                 # cek budget, exit 1 bila lewat
+    python -m benchmarks.bench_import -o import.json
+
+Waktu diukur sebagai median wall-clock `python -c "import <mod>"` dikurangi
+median probe yang sama untuk modul yang sudah ter-load, dan modul berat
+(PIL, google.generativeai, matplotlib, numpy, IPython) tidak boleh ikut
+ter-import.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# modul -> budget milidetik di atas interpreter kosong
+BUDGETS_MS = {
+    "gemini": 15,
+    "gemini.clean": 25,
+    "gemini.metrics": 25,
+    "gemini.pipeline": 40,
+    "gemini.plot": 15,
+    "gemini.extract": 60,
+    "gemini.cli": 60,
+}
+
+HEAVY = ("PIL", "google.generativeai", "matplotlib", "numpy", "IPython", "dotenv", "aiohttp")
+
+_PROBE = (
+    "import importlib, json, sys; importlib.import_module({mod!r}); "
+    "print(json.dumps([m for m in {heavy!r} if m in sys.modules]))"
+)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _time_python(code, repeat):
+    times, out = [], ""
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, cwd=ROOT
+        )
+        times.append(time.perf_counter() - t0)
+        if proc.returncode != 0:
+            raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr else "import failed")
+        out = proc.stdout
+    return statistics.median(times), out
+
+
+def run(repeat=7, modules=None):
+    # baseline = the same probe on an already-loaded module
+    baseline, _ = _time_python(_PROBE.format(mod="json", heavy=HEAVY), repeat)
+    results = []
+    for mod in modules or BUDGETS_MS:
+        budget = BUDGETS_MS.get(mod)
+        row = {"module": mod, "budget_ms": budget}
+        try:
+            median, out = _time_python(_PROBE.format(mod=mod, heavy=HEAVY), repeat)
+        except RuntimeError as e:
+            row.update(error=str(e), ok=False)
+        else:
+            heavy = json.loads(out)
+            ms = max(0.0, (median - baseline) * 1000)
+            row.update(
+                import_ms=round(ms, 2),
+                heavy_loaded=heavy,
+                ok=not heavy and (budget is None or ms <= budget),
+            )
+        results.append(row)
+        status = "ok" if row["ok"] else "FAIL"
+        detail = row.get("error") or f"{row['import_ms']:8.2f} ms (budget {budget} ms) heavy={row['heavy_loaded']}"
+        print(f"{mod:20s} {status:4s}  {detail}", file=sys.stderr)
+    return {"benchmark": "import_time", "baseline_ms": round(baseline * 1000, 2), "results": results}
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("modules", nargs="*", help="default: semua modul di BUDGETS_MS")
+    p.add_argument("--repeat", type=int, default=7)
+    p.add_argument("-o", "--output", help="tulis hasil JSON ke file ini")
+    args = p.parse_args(argv)
+
+    result = run(args.repeat, args.modules)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+    else:
+        print(json.dumps(result, indent=2))
+    return 0 if all(r["ok"] for r in result["results"]) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
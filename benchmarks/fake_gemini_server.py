@@ -0,0 +1,179 @@
+# benchmarks/fake_gemini_server.py
+"""
+Fake Gemini REST server lokal (stdlib saja) untuk menguji & membenchmark
+`gemini.client.AsyncExtractionClient` tanpa kuota sungguhan.
+
+Menyuntikkan latensi (mean + jitter) dan 429 acak / berbasis kuota, dan
+menjawab `generateContent` dengan JSON kalengan sesuai responseSchema.
+
+    with FakeGeminiServer(latency=0.2, error_rate=0.1) as server:
+        client = AsyncExtractionClient("fake", base_url=server.url)
+"""
+import json
+import random
+import re
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+MONTHS = [
+    "January", "February", "March", "April", "May", "June",
+    "July", "August", "September", "October", "November", "December"
+]
+
+_PATH = re.compile(r"^/v1beta/models/(?P<model>[^/:]+):generateContent$")
+
+
+def canned_response(kind, first_year=1890, n_years=10, rng=random):
+    """Respons JSON kalengan untuk "metadata" / "monthly" / "totals"."""
+    if kind == "metadata":
+        return {
+            "Year": first_year,
+            "StationNumber": 1234,
+            "Location": "ABERSYCHAN",
+            "County": "Monmouth",
+            "River_basin": "Usk",
+            "Type_of_gauge": "Snowdon",
+            "Observer": "Mr. J. Jones",
+        }
+    if kind == "monthly":
+        return {"rainfall": [
+            {"Year": first_year + i, "rainfall": [
+                {"Month": m, "rainfall": f"{rng.uniform(0.2, 9.9):.2f}"} for m in MONTHS
+            ]}
+            for i in range(n_years)
+        ]}
+    return {"Totals": [f"{rng.uniform(30, 70):.2f}" for _ in range(n_years)]}
+
+
+def _kind_of(body):
+    props = body.get("generationConfig", {}).get("responseSchema", {}).get("properties", {})
+    if "Totals" in props:
+        return "totals"
+    if "rainfall" in props:
+        return "monthly"
+    return "metadata"
+
+
+class FakeGeminiServer:
+    """
+    Server HTTP/1.1 (keep-alive) di thread latar.
+
+    latency / jitter : detik; tiap respons tidur uniform(latency ± jitter)
+    error_rate       : peluang 429 acak per request
+    rpm              : jika diisi, request di atas rpm per 60 detik dapat 429
+    retry_after      : nilai header Retry-After pada 429 (None = tanpa header)
+    fail_first       : N request pertama selalu 429 (deterministik, untuk tes)
+
+    `arrivals` mencatat waktu (time.monotonic) tiap request yang masuk.
+    """
+
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, rpm=None,
+                 retry_after=None, host="127.0.0.1", port=0, seed=None, fail_first=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rpm = rpm
+        self.retry_after = retry_after
+        self.fail_first = fail_first
+        self.rng = random.Random(seed)
+        self.stats = {"requests": 0, "ok": 0, "throttled": 0}
+        self.arrivals = []
+        self._window = deque()
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _decide(self):
+        """Return (throttle?, sleep seconds) for one request."""
+        with self._lock:
+            self.stats["requests"] += 1
+            now = time.monotonic()
+            self.arrivals.append(now)
+            throttle = self.stats["requests"] <= self.fail_first or self.rng.random() < self.error_rate
+            if self.rpm is not None:
+                while self._window and now - self._window[0] > 60.0:
+                    self._window.popleft()
+                if len(self._window) >= self.rpm:
+                    throttle = True
+                elif not throttle:
+                    self._window.append(now)
+            self.stats["throttled" if throttle else "ok"] += 1
+            delay = max(0.0, self.latency + self.rng.uniform(-self.jitter, self.jitter))
+        return throttle, delay
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status, payload, headers=()):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for k, v in headers:
+                    self.send_header(k, v)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                raw = self.rfile.read(length)
+                if not _PATH.match(self.path.split("?")[0]):
+                    self._send(404, {"error": {"code": 404, "message": "not found"}})
+                    return
+                try:
+                    body = json.loads(raw)
+                except ValueError:
+                    self._send(400, {"error": {"code": 400, "message": "bad json"}})
+                    return
+
+                throttle, delay = server._decide()
+                time.sleep(delay)
+                if throttle:
+                    headers = []
+                    if server.retry_after is not None:
+                        headers.append(("Retry-After", str(server.retry_after)))
+                    self._send(429, {"error": {"code": 429, "status": "RESOURCE_EXHAUSTED"}}, headers)
+                    return
+
+                with server._lock:
+                    text = json.dumps(canned_response(_kind_of(body), rng=server.rng))
+                self._send(200, {
+                    "candidates": [{"content": {"role": "model", "parts": [{"text": text}]}}],
+                    "usageMetadata": {
+                        "promptTokenCount": 300 + len(raw) // 1000,
+                        "candidatesTokenCount": len(text) // 4,
+                    },
+                })
+
+        return Handler
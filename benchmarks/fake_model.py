@@ -0,0 +1,168 @@
+# benchmarks/fake_model.py
+"""
+Fake model yang memutar ulang respons `metadata` / `monthly` / `totals`
+dari fixture tersimpan, dengan latensi mengikuti distribusi di latency.json.
+
+Fixture bawaan sepenuhnya sintetis (lihat fixtures/README.md), bukan
+rekaman live.
+
+Struktur fixture:
+    fixtures/latency.json          {"metadata": {"median": s, "p95": s}, ...}
+    fixtures/pages/<page>/metadata.json, monthly.json, totals.json
+
+`RecordingModel` membungkus model asli (genai.GenerativeModel) untuk
+merekam fixture baru dari panggilan live.
+"""
+import json
+import math
+import os
+import random
+import threading
+import time
+from types import SimpleNamespace
+
+from gemini.schemas import EXTRACTIONS
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+KINDS = tuple(EXTRACTIONS)  # ("metadata", "monthly", "totals")
+
+# z-score untuk persentil 95 dari distribusi normal
+_Z95 = 1.6448536269514722
+
+
+def _kind_of(contents, generation_config=None):
+    """Tentukan jenis panggilan dari response_schema atau teks prompt."""
+    if isinstance(generation_config, dict):
+        schema = generation_config.get("response_schema")
+    else:
+        schema = getattr(generation_config, "response_schema", None)
+    for kind, (prompt, kind_schema) in EXTRACTIONS.items():
+        if schema is kind_schema:
+            return kind
+    text = " ".join(c for c in contents if isinstance(c, str))
+    for kind, (prompt, _) in EXTRACTIONS.items():
+        if prompt in text:
+            return kind
+    return "metadata"
+
+
+class LatencyModel:
+    """Latensi lognormal per jenis panggilan, dari median & p95 latency.json."""
+
+    def __init__(self, spec, scale=1.0, seed=None):
+        self.params = {
+            kind: (math.log(v["median"]), math.log(v["p95"] / v["median"]) / _Z95)
+            for kind, v in spec.items()
+        }
+        self.scale = scale
+        self.rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self, kind):
+        # kinds without a spec don't sleep (lognormal(0, 0) would be 1 s)
+        if kind not in self.params:
+            return 0.0
+        mu, sigma = self.params[kind]
+        with self._lock:
+            return self.rng.lognormvariate(mu, sigma) * self.scale
+
+
+class FakeModel:
+    """
+    Pengganti `genai.GenerativeModel` untuk benchmark offline.
+
+    latency_scale : pengali latensi latency.json (0 = tanpa tidur)
+    pages         : daftar nama halaman fixture; diputar round-robin per
+                    panggilan "metadata" (awal halaman baru)
+    """
+
+    def __init__(self, fixtures_dir=FIXTURES_DIR, latency_scale=1.0, seed=0, pages=None):
+        self.fixtures_dir = fixtures_dir
+        with open(os.path.join(fixtures_dir, "latency.json")) as f:
+            self.latency = LatencyModel(json.load(f), scale=latency_scale, seed=seed)
+        pages_dir = os.path.join(fixtures_dir, "pages")
+        self.pages = pages or sorted(os.listdir(pages_dir))
+        self.responses = {
+            page: {kind: self._read(os.path.join(pages_dir, page, f"{kind}.json")) for kind in KINDS}
+            for page in self.pages
+        }
+        self._local = threading.local()
+        self._next_page = 0
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    @staticmethod
+    def _read(path):
+        with open(path) as f:
+            return f.read()
+
+    def _page(self, kind):
+        # tiap thread (worker) memegang halamannya sendiri sampai "metadata" berikutnya
+        if kind == "metadata" or not hasattr(self._local, "page"):
+            with self._lock:
+                self._local.page = self.pages[self._next_page % len(self.pages)]
+                self._next_page += 1
+        return self._local.page
+
+    def generate_content(self, contents, generation_config=None, **kwargs):
+        kind = _kind_of(contents, generation_config)
+        text = self.responses[self._page(kind)][kind]
+        delay = self.latency.sample(kind)
+        if delay > 0:
+            time.sleep(delay)
+        with self._lock:
+            self.calls += 1
+        return SimpleNamespace(
+            text=text,
+            usage_metadata=SimpleNamespace(
+                prompt_token_count=300, candidates_token_count=len(text) // 4
+            ),
+        )
+
+
+class RecordingModel:
+    """
+    Bungkus model asli; simpan respons ke fixtures/pages/<page>/<kind>.json
+    dan kumpulkan latensi untuk `write_latency()`.
+    """
+
+    def __init__(self, model, page, fixtures_dir=FIXTURES_DIR):
+        self.model = model
+        self.page_dir = os.path.join(fixtures_dir, "pages", page)
+        self.fixtures_dir = fixtures_dir
+        self.samples = {kind: [] for kind in KINDS}
+        os.makedirs(self.page_dir, exist_ok=True)
+
+    def generate_content(self, contents, generation_config=None, **kwargs):
+        kind = _kind_of(contents, generation_config)
+        t0 = time.perf_counter()
+        result = self.model.generate_content(contents, generation_config=generation_config, **kwargs)
+        self.samples[kind].append(time.perf_counter() - t0)
+        with open(os.path.join(self.page_dir, f"{kind}.json"), "w") as f:
+            f.write(result.text)
+        return result
+
+    def write_latency(self):
+        """
+        Tulis median/p95 latensi yang terekam ke fixtures/latency.json.
+        Jenis tanpa sampel mempertahankan nilai lama di file tersebut.
+        """
+        path = os.path.join(self.fixtures_dir, "latency.json")
+        try:
+            with open(path) as f:
+                spec = json.load(f)
+        except (OSError, ValueError):
+            spec = {}
+        for kind, values in self.samples.items():
+            if not values:
+                continue
+            values = sorted(values)
+            spec[kind] = {
+                "median": values[len(values) // 2],
+                "p95": values[min(len(values) - 1, int(0.95 * len(values)))],
+            }
+            # lognormal butuh p95 > median
+            spec[kind]["p95"] = max(spec[kind]["p95"], spec[kind]["median"] * 1.01)
+        with open(path, "w") as f:
+            json.dump(spec, f, indent=2)
+        return spec
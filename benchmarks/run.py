@@ -0,0 +1,255 @@
+# benchmarks/run.py
+"""
+Benchmark suite offline (tanpa Gemini live).
+
+    python -m benchmarks.run                          # semua benchmark
+    python -m benchmarks.run --quick -k clean         # filter nama
+    python -m benchmarks.run -o results.json          # simpan hasil (JSON)
+    python -m benchmarks.run --compare base.json      # exit 1 jika regresi
+
+Hasil berisi median/min/mean per panggilan dan commit git, sehingga dua
+file hasil dari commit berbeda bisa dibandingkan dengan --compare.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+from benchmarks import synthetic
+from gemini.clean import clean_gemini_json, clean_totals_json, normalize_rainfall_value
+
+BENCHMARKS = []  # list of (name, params, setup)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def benchmark(name, cases=({},)):
+    """
+    Daftarkan fungsi setup; setup(args, **params) mengembalikan
+    (fn, items) dengan `fn` tanpa argumen yang diukur dan `items`
+    jumlah unit kerja per panggilan (untuk throughput).
+    """
+    def wrap(setup):
+        for params in cases:
+            BENCHMARKS.append((name, dict(params), setup))
+        return setup
+    return wrap
+
+
+def full_name(name, params):
+    if not params:
+        return name
+    return name + "[" + ",".join(f"{k}={v}" for k, v in params.items()) + "]"
+
+
+# --- Cleaning ---
+@benchmark("normalize_rainfall_value", cases=({"n": 10000},))
+def _bench_normalize(args, n):
+    values = synthetic.rainfall_strings(n, seed=1)
+    return (lambda: [normalize_rainfall_value(v) for v in values]), n
+
+
+@benchmark("clean_gemini_json", cases=({"years": 10}, {"years": 100}, {"years": 1000}))
+def _bench_clean_monthly(args, years):
+    raw = synthetic.monthly_raw(years, first_year=1000, seed=years)
+    return (lambda: clean_gemini_json(raw)), years
+
+
+@benchmark("clean_totals_json", cases=({"years": 10}, {"years": 100}, {"years": 1000}))
+def _bench_clean_totals(args, years):
+    monthly = clean_gemini_json(synthetic.monthly_raw(years, first_year=1000, seed=years))
+    raw = synthetic.totals_raw(monthly, seed=years)
+    return (lambda: clean_totals_json(raw, monthly)), years
+
+
+# --- Plot ---
+def _plot_inputs(years):
+    monthly = clean_gemini_json(synthetic.monthly_raw(years, first_year=1890, seed=years))
+    totals = clean_totals_json(synthetic.totals_raw(monthly, seed=years), monthly)
+    return synthetic.page_image(), synthetic.metadata(), monthly, totals
+
+
+@benchmark("plot_build", cases=({"years": 10},))
+def _bench_plot_build(args, years):
+    from gemini.plot import generate_plot
+
+    img, metadata, monthly, totals = _plot_inputs(years)
+    return (lambda: generate_plot(img, metadata, monthly, totals)), 1
+
+
+@benchmark("plot_savefig", cases=({"years": 10},))
+def _bench_plot_savefig(args, years):
+    from gemini.plot import generate_plot
+
+    img, metadata, monthly, totals = _plot_inputs(years)
+
+    def run():
+        fig = generate_plot(img, metadata, monthly, totals)
+        buf = io.BytesIO()
+        # same settings as app.py
+        fig.savefig(buf, format="png", dpi=200, bbox_inches="tight")
+        return buf
+
+    return run, 1
+
+
+# --- End to end (fake model) ---
+def process_page(model, img):
+    """Alur app.py untuk satu halaman: 3 ekstraksi, cleaning, plot, savefig."""
+    from gemini.pipeline import process_page
+
+    return process_page(img, model=model)
+
+
+@benchmark("e2e_single_page")
+def _bench_e2e_single(args):
+    from benchmarks.fake_model import FakeModel
+
+    model = FakeModel(latency_scale=args.latency_scale, seed=0)
+    img = synthetic.page_image()
+    return (lambda: process_page(model, img)), 1
+
+
+@benchmark("e2e_batch", cases=({"pages": 24, "workers": 1}, {"pages": 24, "workers": 8}))
+def _bench_e2e_batch(args, pages, workers):
+    from concurrent.futures import ThreadPoolExecutor
+
+    from benchmarks.fake_model import FakeModel
+
+    model = FakeModel(latency_scale=args.latency_scale, seed=0)
+    img = synthetic.page_image()
+
+    def run():
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(lambda _: process_page(model, img), range(pages)))
+
+    return run, pages
+
+
+# --- Runner ---
+def measure(fn, repeat=5, min_time=0.2):
+    """Seperti timeit.autorange: cari jumlah loop >= min_time, lalu ulangi."""
+    loops = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        elapsed = time.perf_counter() - t0
+        if elapsed >= min_time or loops >= 1_000_000:
+            break
+        loops *= 10 if elapsed < min_time / 10 else 2
+
+    per_call = [elapsed / loops]
+    for _ in range(repeat - 1):
+        t0 = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        per_call.append((time.perf_counter() - t0) / loops)
+    return loops, per_call
+
+
+def _git_commit():
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=10, cwd=ROOT
+        )
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run_suite(args):
+    results = []
+    for name, params, setup in BENCHMARKS:
+        fname = full_name(name, params)
+        if args.filter and not any(k in fname for k in args.filter):
+            continue
+        try:
+            fn, items = setup(args, **params)
+        except ImportError as e:
+            print(f"{fname:45s} skipped ({e})", file=sys.stderr)
+            continue
+        loops, per_call = measure(fn, repeat=args.repeat, min_time=args.min_time)
+        median = statistics.median(per_call)
+        row = {
+            "name": fname,
+            "params": params,
+            "loops": loops,
+            "repeat": len(per_call),
+            "median_s": median,
+            "min_s": min(per_call),
+            "mean_s": statistics.fmean(per_call),
+            "stdev_s": statistics.stdev(per_call) if len(per_call) > 1 else 0.0,
+            "items": items,
+            "items_per_s": items / median if median else None,
+        }
+        results.append(row)
+        print(f"{fname:45s} {median * 1e3:12.3f} ms  {row['items_per_s']:14.1f} items/s", file=sys.stderr)
+
+    return {
+        "commit": _git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "latency_scale": args.latency_scale,
+        "results": results,
+    }
+
+
+def compare(current, baseline, threshold=0.10):
+    """
+    Bandingkan median per benchmark. Mengembalikan daftar regresi
+    (nama, rasio) untuk rasio > 1 + threshold.
+    """
+    base = {r["name"]: r for r in baseline.get("results", [])}
+    regressions = []
+    print(f"\nvs {baseline.get('commit') or 'baseline'} (threshold {threshold:.0%})", file=sys.stderr)
+    for r in current["results"]:
+        old = base.get(r["name"])
+        if old is None or not old["median_s"]:
+            continue
+        ratio = r["median_s"] / old["median_s"]
+        flag = "REGRESSION" if ratio > 1 + threshold else ""
+        print(f"{r['name']:45s} {ratio:8.3f}x  {flag}", file=sys.stderr)
+        if flag:
+            regressions.append((r["name"], ratio))
+    return regressions
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("-k", "--filter", action="append", help="jalankan benchmark yang namanya memuat teks ini")
+    p.add_argument("-o", "--output", help="tulis hasil JSON ke file ini")
+    p.add_argument("--compare", help="file hasil JSON baseline untuk deteksi regresi")
+    p.add_argument("--threshold", type=float, default=0.10, help="toleransi regresi median (default 0.10)")
+    p.add_argument("--repeat", type=int, default=5)
+    p.add_argument("--min-time", type=float, default=0.2, help="detik minimal per pengulangan")
+    p.add_argument("--latency-scale", type=float, default=0.01,
+                   help="pengali latensi fixture fake model (1.0 = nilai latency.json)")
+    p.add_argument("--quick", action="store_true", help="repeat=3, min-time=0.05")
+    args = p.parse_args(argv)
+    if args.quick:
+        args.repeat, args.min_time = 3, 0.05
+
+    current = run_suite(args)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(current, f, indent=2)
+    else:
+        print(json.dumps(current, indent=2))
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(current, json.load(f), args.threshold)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
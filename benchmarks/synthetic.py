@@ -0,0 +1,109 @@
+# benchmarks/synthetic.py
+"""
+Generator data sintetis untuk benchmark: grid bulanan 10–1000 tahun
+dengan noise ala OCR (spasi, huruf O/l, pemisah aneh, nilai kosong).
+"""
+import random
+
+MONTHS = [
+    "January", "February", "March", "April", "May", "June",
+    "July", "August", "September", "October", "November", "December"
+]
+
+# bentuk-bentuk salah baca OCR yang sering muncul di tabel lama
+_NOISE = [
+    lambda s: s.replace(".", " "),          # "4.44" -> "4 44"
+    lambda s: s.replace(".", ""),           # "4.44" -> "444"
+    lambda s: s.replace("0", "O"),          # "0.66" -> "O.66"
+    lambda s: s.replace("1", "l"),          # "1.21" -> "l.2l"
+    lambda s: s.replace(".", "-"),          # "4.44" -> "4-44"
+    lambda s: s.replace(".", ","),
+    lambda s: s.lstrip("0"),                # "0.66" -> ".66"
+    lambda s: s + ".",
+]
+_EMPTY = ["-", "–", "—", "", None]
+
+
+def rainfall_string(rng, noise_rate=0.15, missing_rate=0.05):
+    """Satu nilai curah hujan mentah seperti keluaran OCR."""
+    if rng.random() < missing_rate:
+        return rng.choice(_EMPTY)
+    s = f"{rng.uniform(0.05, 9.99):.2f}"
+    if rng.random() < noise_rate:
+        s = rng.choice(_NOISE)(s)
+    return s
+
+
+def rainfall_strings(n, seed=0, **kwargs):
+    rng = random.Random(seed)
+    return [rainfall_string(rng, **kwargs) for _ in range(n)]
+
+
+def monthly_raw(n_years=10, first_year=1890, seed=0, noise_rate=0.15,
+                missing_rate=0.05, drop_month_rate=0.02, drop_year_rate=0.0):
+    """`monthly` JSON mentah (sebelum clean_gemini_json) untuk `n_years` tahun."""
+    rng = random.Random(seed)
+    blocks = []
+    for i in range(n_years):
+        if rng.random() < drop_year_rate:
+            continue
+        months = [
+            {"Month": m, "rainfall": rainfall_string(rng, noise_rate, missing_rate)}
+            for m in MONTHS
+            if rng.random() >= drop_month_rate
+        ]
+        blocks.append({"Year": first_year + i, "rainfall": months})
+    # OCR tidak selalu menjaga urutan tahun
+    if n_years > 1 and rng.random() < 0.5:
+        j = rng.randrange(len(blocks) - 1) if len(blocks) > 1 else 0
+        blocks[j:j + 2] = blocks[j:j + 2][::-1]
+    return {"rainfall": blocks}
+
+
+def totals_raw(monthly_clean, seed=0, error_rate=0.1, shuffle_rate=0.1):
+    """
+    `totals` JSON mentah yang konsisten dengan `monthly_clean` (sudah bersih),
+    dengan sedikit salah baca dan pertukaran urutan.
+    """
+    rng = random.Random(seed)
+    totals = []
+    for yb in monthly_clean.get("rainfall", []):
+        vals = [m["rainfall"] for m in yb["rainfall"] if m["rainfall"] != "-"]
+        total = round(sum(vals), 2) if vals else None
+        if total is None:
+            totals.append("-")
+            continue
+        if rng.random() < error_rate:
+            total += rng.uniform(-3, 3)
+        totals.append(f"{total:.2f}")
+    if len(totals) > 1 and rng.random() < shuffle_rate:
+        j = rng.randrange(len(totals) - 1)
+        totals[j], totals[j + 1] = totals[j + 1], totals[j]
+    return {"Totals": totals}
+
+
+def metadata(seed=0):
+    rng = random.Random(seed)
+    return {
+        "station": {
+            "StationNumber": rng.randrange(1000, 9999),
+            "Location": rng.choice(["ABERDARE", "ABERSYCHAN", "NANTHIR RES", "MARDY"]),
+            "County": "Glamorgan",
+            "River_basin": "Taff",
+            "Type_of_gauge": "Snowdon",
+            "Observer": "Mr. T. Evans",
+        }
+    }
+
+
+def page_image(width=900, height=1200, seed=0):
+    """Gambar halaman sintetis (array uint8 RGB) untuk benchmark plot."""
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    img = np.full((height, width, 3), 235, dtype=np.uint8)
+    # garis-garis tabel + noise agar kompresi PNG tidak terlalu mudah
+    img[::40, :, :] = 60
+    img[:, ::75, :] = 60
+    img += rng.integers(0, 12, size=img.shape, dtype=np.uint8)
+    return img
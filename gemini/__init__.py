@@ -0,0 +1,31 @@
+"""Rainfall table extraction helpers (Gemini OCR, cleaning, analytics).
+
+Pipeline API di-export secara lazy (PEP 562), jadi `import gemini` tidak
+memuat PIL / google.generativeai / matplotlib / numpy.
+"""
+import importlib
+
+_LAZY = {
+    "normalize_rainfall_value": "gemini.clean",
+    "clean_gemini_json": "gemini.clean",
+    "clean_totals_json": "gemini.clean",
+    "extract_metadata": "gemini.extract",
+    "extract_monthly": "gemini.extract",
+    "extract_totals": "gemini.extract",
+    "generate_plot": "gemini.plot",
+    "load_image": "gemini.pipeline",
+    "process_page": "gemini.pipeline",
+    "clean_page": "gemini.pipeline",
+    "render_png": "gemini.pipeline",
+}
+
+__all__ = sorted(_LAZY)
+
+
+def __getattr__(name):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module 'gemini' has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
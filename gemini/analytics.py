@@ -0,0 +1,284 @@
+# gemini/analytics.py
+"""
+Station climatology & anomaly analytics on stacked monthly rainfall.
+
+Cleaned `monthly` JSON (output of clean_gemini_json) is stacked into a
+`stations x years x 12` float array where missing values ("-") are NaN.
+All statistics are computed vectorized over the whole cube, so thousands
+of stations are handled in one pass instead of looping `rainfall` dicts.
+"""
+import json
+
+import numpy as np
+
+
+MONTHS = [
+    "January", "February", "March", "April", "May", "June",
+    "July", "August", "September", "October", "November", "December"
+]
+MONTH_INDEX = {m: i for i, m in enumerate(MONTHS)}
+# the plot code also accepts 3-letter names
+MONTH_INDEX.update({m[:3]: i for i, m in enumerate(MONTHS)})
+
+
+def _to_float(val):
+    """Nilai bersih ("-" / float) -> float atau NaN."""
+    if val in ("-", None, ""):
+        return np.nan
+    try:
+        return float(val)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def monthly_to_array(monthly):
+    """
+    Ubah satu `monthly` JSON (sudah dibersihkan) menjadi
+    (years, values) dengan values berbentuk (n_years, 12), NaN = kosong.
+    """
+    blocks = [yb for yb in monthly.get("rainfall", []) if isinstance(yb.get("Year"), int)]
+    years = np.array(sorted({yb["Year"] for yb in blocks}), dtype=np.int64)
+    values = np.full((len(years), 12), np.nan)
+    row_of = {int(y): i for i, y in enumerate(years)}
+
+    for yb in blocks:
+        row = row_of[yb["Year"]]
+        for m in yb.get("rainfall", []):
+            col = MONTH_INDEX.get(m.get("Month"))
+            if col is None:
+                continue
+            values[row, col] = _to_float(m.get("rainfall"))
+    return years, values
+
+
+# --- Vectorized statistics (operate on any `... x years x 12` array) ---
+def climatology(data, min_years=1):
+    """
+    Rata-rata jangka panjang per bulan (NaN-aware) sepanjang sumbu tahun.
+    Bulan dengan kurang dari `min_years` nilai valid diisi NaN.
+    """
+    valid = ~np.isnan(data)
+    count = valid.sum(axis=-2)
+    total = np.where(valid, data, 0.0).sum(axis=-2)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        clim = total / count
+    clim[count < max(min_years, 1)] = np.nan
+    return clim
+
+
+def anomalies(data, clim=None, min_years=1):
+    """Selisih tiap nilai terhadap klimatologi bulanannya."""
+    if clim is None:
+        clim = climatology(data, min_years=min_years)
+    return data - clim[..., np.newaxis, :]
+
+
+def annual_totals(data, min_months=12):
+    """Total tahunan; tahun dengan bulan valid < `min_months` diisi NaN."""
+    valid = ~np.isnan(data)
+    totals = np.where(valid, data, 0.0).sum(axis=-1)
+    totals[valid.sum(axis=-1) < min_months] = np.nan
+    return totals
+
+
+def rolling_stats(data, window=10, min_periods=None, axis=-2):
+    """
+    Statistik bergulir (default dekadal) sepanjang sumbu tahun `axis`
+    (-2 untuk (..., years, 12), -1 untuk total tahunan (..., years)).
+
+    Hasil berupa dict `mean`, `std`, `count` dengan sumbu tahun sepanjang
+    years - window + 1; jendela ke-i berakhir pada tahun ke-(i + window - 1).
+    """
+    if window < 1:
+        raise ValueError(f"window must be >= 1, got {window}")
+    if min_periods is None:
+        min_periods = window
+    axis = axis % data.ndim
+    n_years = data.shape[axis]
+    if n_years < window:
+        shape = list(data.shape)
+        shape[axis] = 0
+        empty = np.empty(shape)
+        return {"mean": empty, "std": empty.copy(), "count": empty.astype(np.int64)}
+
+    valid = ~np.isnan(data)
+    filled = np.where(valid, data, 0.0)
+
+    def window_sum(arr):
+        # cumulative sum with a leading zero so window sums are a difference
+        pad = [(0, 0)] * arr.ndim
+        pad[axis] = (1, 0)
+        cs = np.pad(np.cumsum(arr, axis=axis), pad)
+        hi = np.take(cs, np.arange(window, n_years + 1), axis=axis)
+        lo = np.take(cs, np.arange(0, n_years - window + 1), axis=axis)
+        return hi - lo
+
+    count = window_sum(valid.astype(np.int64))
+    s1 = window_sum(filled)
+    s2 = window_sum(filled * filled)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = s1 / count
+        var = s2 / count - mean * mean
+    std = np.sqrt(np.clip(var, 0.0, None))
+
+    short = count < max(min_periods, 1)
+    mean[short] = np.nan
+    std[short] = np.nan
+    return {"mean": mean, "std": std, "count": count}
+
+
+def coverage(data, axis=-2):
+    """Fraksi nilai valid (0..1) sepanjang `axis` (default: tahun)."""
+    if data.shape[axis] == 0:
+        return np.zeros(np.delete(data.shape, axis))
+    return (~np.isnan(data)).mean(axis=axis)
+
+
+# --- Station archive with cached results ---
+def _freeze(value):
+    """Jadikan array hasil cache read-only (juga di dalam tuple/dict)."""
+    if isinstance(value, np.ndarray):
+        value.setflags(write=False)
+    elif isinstance(value, (tuple, list)):
+        for v in value:
+            _freeze(v)
+    elif isinstance(value, dict):
+        for v in value.values():
+            _freeze(v)
+    return value
+
+
+class StationArchive:
+    """
+    Kumpulan halaman `monthly` per stasiun, ditumpuk menjadi kubus
+    `stations x years x 12`.
+
+    Hasil analitik di-cache dan otomatis di-invalidasi setiap kali
+    halaman baru ditambahkan lewat `add_page`.
+    """
+
+    def __init__(self):
+        self._pages = {}  # station -> {year: np.ndarray(12)}
+        self._version = 0
+        self._cache = {}
+        self._cache_version = -1
+
+    def __len__(self):
+        return len(self._pages)
+
+    @property
+    def version(self):
+        return self._version
+
+    def add_page(self, station, monthly):
+        """
+        Tambahkan satu halaman (monthly JSON bersih) untuk `station`.
+        Nilai baru menimpa nilai lama hanya jika tidak kosong.
+        """
+        years, values = monthly_to_array(monthly)
+        rows = self._pages.setdefault(station, {})
+        for year, row in zip(years.tolist(), values):
+            if year in rows:
+                old = rows[year]
+                rows[year] = np.where(np.isnan(row), old, row)
+            else:
+                rows[year] = row.copy()
+        self._version += 1
+
+    def add_json(self, station, path):
+        """Tambahkan halaman dari file `monthly` JSON."""
+        with open(path, "r") as f:
+            self.add_page(station, json.load(f))
+
+    def _cached(self, key, compute):
+        if self._cache_version != self._version:
+            self._cache = {}
+            self._cache_version = self._version
+        if key not in self._cache:
+            self._cache[key] = _freeze(compute())
+        value = self._cache[key]
+        # dict baru agar pemanggil tidak bisa mengganti isi cache
+        return dict(value) if isinstance(value, dict) else value
+
+    def cube(self):
+        """
+        Kembalikan (stations, years, data) dengan data (S, Y, 12).
+        Array hasil (di sini dan di method lain) read-only; salin dulu
+        (`arr.copy()`) bila ingin diubah.
+        """
+        return self._cached(("cube",), self._stack)
+
+    def _stack(self):
+        stations = tuple(sorted(self._pages, key=str))
+        all_years = sorted({y for rows in self._pages.values() for y in rows})
+        years = np.array(all_years, dtype=np.int64)
+        data = np.full((len(stations), len(years), 12), np.nan)
+        if not all_years:
+            return stations, years, data
+
+        first = all_years[0]
+        # year -> column lookup as a dense table (years are small integers)
+        lookup = np.full(all_years[-1] - first + 1, -1, dtype=np.int64)
+        lookup[years - first] = np.arange(len(years))
+
+        for s, station in enumerate(stations):
+            rows = self._pages[station]
+            if not rows:
+                continue
+            idx = lookup[np.fromiter(rows.keys(), dtype=np.int64, count=len(rows)) - first]
+            data[s, idx] = np.stack(list(rows.values()))
+        return stations, years, data
+
+    def climatology(self, min_years=1):
+        """Klimatologi (S, 12) untuk semua stasiun."""
+        return self._cached(
+            ("climatology", min_years),
+            lambda: climatology(self.cube()[2], min_years=min_years),
+        )
+
+    def anomalies(self, min_years=1):
+        """Anomali (S, Y, 12) terhadap klimatologi tiap stasiun."""
+        return self._cached(
+            ("anomalies", min_years),
+            lambda: anomalies(self.cube()[2], self.climatology(min_years)),
+        )
+
+    def annual_totals(self, min_months=12):
+        """Total tahunan (S, Y)."""
+        return self._cached(
+            ("annual_totals", min_months),
+            lambda: annual_totals(self.cube()[2], min_months=min_months),
+        )
+
+    def rolling(self, window=10, min_periods=None, annual=False):
+        """
+        Statistik dekadal bergulir. Jika `annual=True` dihitung dari total
+        tahunan (S, Y'), selain itu per bulan (S, Y', 12).
+        Mengembalikan dict dengan tambahan `end_years`.
+        """
+        def compute():
+            data = self.annual_totals() if annual else self.cube()[2]
+            stats = rolling_stats(
+                data, window=window, min_periods=min_periods, axis=-1 if annual else -2
+            )
+            stats["end_years"] = self.cube()[1][window - 1:]
+            return stats
+
+        return self._cached(("rolling", window, min_periods, annual), compute)
+
+    def coverage(self):
+        """
+        Peta kelengkapan data: dict `station_month` (S, 12),
+        `station_year` (S, Y) dan `overall` (S,).
+        """
+        def compute():
+            data = self.cube()[2]
+            return {
+                "station_month": coverage(data, axis=1),
+                "station_year": coverage(data, axis=2),
+                # explicit shape: reshape(0, -1) fails on an empty archive
+                "overall": coverage(data.reshape(data.shape[0], data.shape[1] * 12), axis=1),
+            }
+
+        return self._cached(("coverage",), compute)
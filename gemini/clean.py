@@ -0,0 +1,219 @@
+# gemini/clean.py
+"""Normalisasi nilai curah hujan OCR dan pembersihan JSON monthly/totals."""
+import re
+import copy
+
+
+def normalize_rainfall_value(val: str):
+    """Bersihkan dan normalisasi angka curah hujan dari string OCR."""
+    if val is None:
+        return "-"
+
+    # Hilangkan spasi dan karakter whitespace
+    val = str(val).strip().replace(" ", "")
+    if val == "" or val in ["-", "–", "—"]:
+        return "-"
+
+    # Perbaiki kesalahan OCR umum (huruf ke angka)
+    val = val.replace("O", "0").replace("o", "0")
+    val = val.replace("l", "1").replace("I", "1")
+
+    # Ganti karakter pemisah aneh jadi titik
+    val = val.replace("-", ".").replace(":", ".").replace("'", ".").replace(",", ".").replace("_", ".")
+
+    # Hapus semua karakter selain angka & titik
+    val = re.sub(r"[^0-9.]", "", val)
+
+    # Jika kosong setelah dibersihkan
+    if val == "":
+        return "-"
+
+    # Lebih dari satu titik → ambil hanya yang pertama
+    parts = val.split(".")
+    if len(parts) > 2:
+        val = parts[0] + "." + parts[1]
+
+    # Tidak ada titik tapi terlalu panjang (contoh "444" → "4.44")
+    if val.isdigit() and len(val) >= 3:
+        val = val[0] + "." + val[1:]
+
+    # Angka diawali titik → tambah 0 (contoh ".66" → "0.66")
+    if val.startswith("."):
+        val = "0" + val
+
+    # Angka diakhiri titik → hapus titik (contoh "44." → "44")
+    if val.endswith("."):
+        val = val[:-1]
+
+    # Konversi ke float jika bisa
+    try:
+       num= round(float(val), 2)
+       if num == 0.0:
+           return "-"
+       return num
+    except ValueError:
+        return "-"
+
+
+def clean_gemini_json(data, expected_years=None, metadata=None, total_years=10):
+    """
+    Membersihkan JSON hasil Gemini Vision, menormalkan nilai curah hujan,
+    menambahkan bulan kosong bila hilang, dan menjaga urutan.
+    Tidak mengasumsikan tahun default (menyesuaikan dari data input).
+    """
+    import copy
+    data_clean = copy.deepcopy(data)
+    rainfall_data = data_clean.get("rainfall", [])
+
+    base_months = [
+        "January", "February", "March", "April", "May", "June",
+        "July", "August", "September", "October", "November", "December"
+    ]
+    
+    # --- Deteksi tahun dari data (jika expected_years tidak diberikan) ---
+    if expected_years is None:
+        detected_years = sorted({
+            y.get("Year") for y in rainfall_data if isinstance(y.get("Year"), int)
+        })
+    else:
+        detected_years = expected_years
+
+    complete_rainfall = []
+    for year in detected_years:
+        year_block = next((y for y in rainfall_data if y.get("Year") == year), None)
+        month_map = {m.get("Month"): m for m in (year_block.get("rainfall", []) if year_block else [])}
+
+        fixed_months = []
+        for m in base_months:
+            if m in month_map:
+                val = month_map[m].get("rainfall", "-")
+                fixed_months.append({
+                    "Month": m,
+                    "rainfall": normalize_rainfall_value(val)
+                })
+            else:
+                fixed_months.append({"Month": m, "rainfall": "-"})
+
+        complete_rainfall.append({"Year": year, "rainfall": fixed_months})
+
+    data_clean["rainfall"] = complete_rainfall
+    return data_clean
+
+def clean_totals_json(data, monthly_data=None, tol_abs=0.5, tol_rel=0.05):
+
+    data_clean = copy.deepcopy(data)
+    totals_raw = data_clean.get("Totals", [])
+    cleaned_totals = [normalize_rainfall_value(v) for v in totals_raw]
+
+    # fallback simple: jika monthly_data tidak ada, buat mapping indeks
+    if not monthly_data or "rainfall" not in monthly_data:
+        if not cleaned_totals:
+            return {"Totals": []}
+        # fallback: map left->right to synthetic years (1..N)
+        n = len(cleaned_totals)
+        return {"Totals": [{"Year": i + 1, "Total": cleaned_totals[i]} for i in range(n)]}
+
+    # build year list and monthly sums
+    year_blocks = monthly_data["rainfall"]
+    year_list = [yb["Year"] for yb in year_blocks]
+
+    monthly_sums = {}
+    years_with_data = []
+    for yb in year_blocks:
+        year = yb["Year"]
+        months = yb.get("rainfall", [])
+        vals = []
+        for m in months:
+            v = m.get("rainfall")
+            if v in ("-", None, ""):
+                continue
+            try:
+                vals.append(float(v))
+            except Exception:
+                # already normalized in monthly cleaning, but safe fallback
+                try:
+                    vals.append(float(str(v).replace(",", ".")))
+                except Exception:
+                    pass
+        if vals:
+            monthly_sums[year] = round(sum(vals), 2)
+            years_with_data.append(year)
+        else:
+            monthly_sums[year] = None  # no data
+
+    # prepare aligned list initial filled with "-"
+    aligned = ["-"] * len(year_list)
+
+    # keep track of which years already assigned
+    assigned_years = set()
+
+    # 1) Try exact / nearest numeric matching for each cleaned_total (in OCR order)
+    for tot in cleaned_totals:
+        if tot == "-" or tot is None:
+            # skip empty total (no mapping)
+            continue
+
+        best_year = None
+        best_diff = None
+        for year in years_with_data:
+            if year in assigned_years:
+                continue
+            sum_val = monthly_sums.get(year)
+            if sum_val is None:
+                continue
+            diff = abs(sum_val - tot)
+            rel = diff / (sum_val if sum_val != 0 else (tot if tot != 0 else 1))
+            # choose smallest diff
+            if (best_diff is None) or (diff < best_diff):
+                best_diff = diff
+                best_year = year
+
+        # accept best match only if within tolerances
+        if best_year is not None:
+            # check tolerances before assigning
+            if best_diff is not None and (best_diff <= tol_abs):
+                idx = year_list.index(best_year)
+                aligned[idx] = tot
+                assigned_years.add(best_year)
+                continue
+            else:
+                # also allow relative tolerance
+                sum_val = monthly_sums.get(best_year, 0) or 0
+                rel = best_diff / (sum_val if sum_val != 0 else 1)
+                if rel <= tol_rel:
+                    idx = year_list.index(best_year)
+                    aligned[idx] = tot
+                    assigned_years.add(best_year)
+                    continue
+        # if no acceptable numeric match, we'll defer to order-based mapping below
+        # (mark this total as "unmapped" for now)
+    # 2) Map remaining (unmapped) totals to years_with_data left->right skipping assigned ones
+    unmapped_totals = []
+    for tot in cleaned_totals:
+        # consider only totals not already placed (value not present in aligned)
+        # but careful to count duplicates => we compare by identity of placement
+        # simplest: if tot is present in aligned as value, assume mapped (works for floats/strings)
+        if tot == "-" or tot is None:
+            continue
+        if any(a == tot for a in aligned):
+            continue
+        unmapped_totals.append(tot)
+
+    # assign unmapped totals sequentially to remaining years_with_data
+    remaining_years = [y for y in years_with_data if y not in assigned_years]
+    for i, tot in enumerate(unmapped_totals):
+        if i < len(remaining_years):
+            year = remaining_years[i]
+            idx = year_list.index(year)
+            aligned[idx] = tot
+            assigned_years.add(year)
+        else:
+            # no years left — ignore extras
+            break
+
+    # final assembly: pair year_list with aligned totals
+    totals_with_year = []
+    for year, val in zip(year_list, aligned):
+        totals_with_year.append({"Year": year, "Total": val})
+
+    return {"Totals": totals_with_year}
@@ -0,0 +1,167 @@
+# gemini/cli.py
+"""
+Command line entry point.
+
+    python -m gemini extract page1.png page2.png -o out/     # out/<nama>/...
+    python -m gemini extract pages/*.png -o out/ --concurrency 8 --rpm 60
+    python -m gemini extract page1.png -o out/ --no-plot
+    python -m gemini clean monthly.json --totals totals.json -o out/
+    python -m gemini export out/* --zip batch.zip --csv batch.csv --netcdf batch.nc
+
+`extract` memakai `gemini.client.AsyncExtractionClient` (butuh aiohttp):
+semua halaman berbagi satu limiter rpm/tpm, retry + backoff dan deadline.
+`clean` hanya memakai stdlib (tanpa PIL / Gemini / matplotlib).
+"""
+import argparse
+import json
+import os
+import sys
+
+from gemini import metrics
+
+
+def _api_key():
+    try:
+        from dotenv import load_dotenv
+    except ImportError:
+        pass
+    else:
+        load_dotenv()
+    return os.getenv("GOOGLE_API_KEY")
+
+
+async def _extract_pages(args):
+    import asyncio
+
+    from gemini.client import DEFAULT_BASE_URL, AsyncExtractionClient
+    from gemini.pipeline import clean_page, load_image, render_png, write_outputs
+
+    pages = asyncio.Semaphore(max(1, args.concurrency))
+    # pyplot is not thread-safe: one render at a time, off the event loop
+    render = asyncio.Lock()
+
+    async def one(client, path):
+        out_dir = os.path.join(args.output, os.path.splitext(os.path.basename(path))[0])
+        try:
+            async with pages:
+                img = load_image(path)
+                raw = await client.extract_all(img)
+            metadata, monthly, totals = clean_page(raw)
+            png = None
+            if not args.no_plot:
+                async with render:
+                    png = await asyncio.to_thread(render_png, img, metadata, monthly, totals, args.dpi)
+        except Exception as e:
+            print(f"{path}: {type(e).__name__}: {e}", file=sys.stderr)
+            return 1
+        result = {"metadata": metadata, "monthly": monthly, "totals": totals, "png": png}
+        for written in write_outputs(result, out_dir):
+            print(written)
+        return 0
+
+    async with AsyncExtractionClient(
+        _api_key(),
+        base_url=args.base_url or DEFAULT_BASE_URL,
+        rpm=args.rpm,
+        tpm=args.tpm,
+        max_connections=3 * max(1, args.concurrency),
+        deadline=args.deadline,
+    ) as client:
+        statuses = await asyncio.gather(*(one(client, path) for path in args.images))
+    return max(statuses, default=0)
+
+
+def _cmd_extract(args):
+    import asyncio
+
+    metrics.start_run()
+    return asyncio.run(_extract_pages(args))
+
+
+def _cmd_clean(args):
+    from gemini.pipeline import clean_files
+
+    monthly, totals = clean_files(args.monthly, args.totals)
+    os.makedirs(args.output, exist_ok=True)
+    outputs = [("monthly_cleaned.json", monthly), ("totals_cleaned.json", totals)]
+    for name, value in outputs:
+        if value is None:
+            continue
+        path = os.path.join(args.output, name)
+        with open(path, "w") as f:
+            json.dump(value, f, indent=2)
+        print(path)
+    return 0
+
+
+def _cmd_export(args):
+    from gemini import export
+
+    if not (args.zip or args.csv or args.netcdf):
+        print("export: give at least one of --zip / --csv / --netcdf", file=sys.stderr)
+        return 2
+    # each writer re-reads the folders lazily, one page at a time;
+    # only the ZIP needs the plot PNGs
+    if args.zip:
+        with open(args.zip, "wb") as f:
+            export.write_zip(f, export.iter_output_dirs(args.dirs))
+        print(args.zip)
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            pages = export.iter_output_dirs(args.dirs, keys=("metadata", "monthly", "totals"))
+            export.write_wide_csv(f, pages)
+        print(args.csv)
+    if args.netcdf:
+        # cheap first pass for the time axis, so the writer can stream
+        years = export.year_range(export.iter_output_dirs(args.dirs, keys=("monthly",)))
+        pages = export.iter_output_dirs(args.dirs, keys=("metadata", "monthly"))
+        export.write_netcdf(args.netcdf, pages, years=years)
+        print(args.netcdf)
+    return 0
+
+
+def build_parser():
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--metrics-prom", help="aktifkan instrumentasi dan tulis file Prometheus")
+    common.add_argument("--metrics-json", help="aktifkan instrumentasi dan tulis file JSON")
+
+    p = argparse.ArgumentParser(prog="python -m gemini", description="Rainfall table extractor")
+    sub = p.add_subparsers(dest="command", required=True)
+
+    pe = sub.add_parser("extract", parents=[common], help="ekstrak, bersihkan & plot gambar tabel")
+    pe.add_argument("images", nargs="+")
+    pe.add_argument("-o", "--output", default=".")
+    pe.add_argument("--no-plot", action="store_true")
+    pe.add_argument("--dpi", type=int, default=200)
+    pe.add_argument("--concurrency", type=int, default=4, help="halaman diproses paralel (default 4)")
+    pe.add_argument("--rpm", type=int, help="batas requests per menit (dibagi semua halaman)")
+    pe.add_argument("--tpm", type=int, help="batas token per menit (dibagi semua halaman)")
+    pe.add_argument("--deadline", type=float, default=120.0, help="detik per panggilan model, termasuk retry")
+    pe.add_argument("--base-url", help="endpoint REST Gemini lain (mis. fake server lokal)")
+    pe.set_defaults(func=_cmd_extract)
+
+    pc = sub.add_parser("clean", parents=[common], help="bersihkan monthly/totals JSON mentah")
+    pc.add_argument("monthly")
+    pc.add_argument("--totals")
+    pc.add_argument("-o", "--output", default=".")
+    pc.set_defaults(func=_cmd_clean)
+
+    px = sub.add_parser("export", parents=[common], help="bundle folder hasil extract (ZIP / CSV / NetCDF)")
+    px.add_argument("dirs", nargs="+", help="folder keluaran `extract` (out/<nama>/)")
+    px.add_argument("--zip", help="bundle ZIP (metadata, monthly, totals, plot)")
+    px.add_argument("--csv", help="CSV lebar: station, year, Jan..Dec, total")
+    px.add_argument("--netcdf", help="NetCDF gaya CF (butuh netCDF4)")
+    px.set_defaults(func=_cmd_export)
+    return p
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.metrics_prom or args.metrics_json:
+        metrics.enable()
+    with metrics.exporting(args.metrics_prom, args.metrics_json):
+        return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,335 @@
+# gemini/client.py
+"""
+Async Gemini extraction client (REST) dengan rate limiting & retry.
+
+- satu `aiohttp.ClientSession` (connection pool, keep-alive) per client
+- token bucket bersama untuk requests/minute dan tokens/minute
+- jittered exponential backoff untuk 429 / 5xx / error koneksi
+- deadline per request (mencakup semua retry)
+
+Contoh:
+    async with AsyncExtractionClient(api_key) as client:
+        raw = await client.extract_all(img)   # {"metadata", "monthly", "totals"}
+"""
+import asyncio
+import base64
+import io
+import json
+import random
+import time
+from types import SimpleNamespace
+
+import aiohttp
+
+from gemini import metrics
+from gemini.schemas import DEFAULT_MODEL, EXTRACTIONS, to_response_schema
+
+DEFAULT_BASE_URL = "https://generativelanguage.googleapis.com"
+
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+
+# Perkiraan token untuk satu gambar + prompt dan output tabel 10 tahun;
+# dikoreksi dengan usageMetadata setelah respons datang.
+IMAGE_TOKENS = 258
+DEFAULT_OUTPUT_TOKENS = 2048
+
+
+class ExtractionError(Exception):
+    """Panggilan model gagal (non-retryable atau retry habis)."""
+
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+class DeadlineExceeded(ExtractionError):
+    """Deadline request habis sebelum respons sukses."""
+
+
+class _Retryable(Exception):
+    def __init__(self, message, status=None, retry_after=None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+# --- Rate limiting ---
+class TokenBucket:
+    """
+    Token bucket async: `rate_per_minute` token terisi merata per menit,
+    maksimal `capacity` (default = rate, yaitu burst satu menit).
+    """
+
+    def __init__(self, rate_per_minute, capacity=None, clock=time.monotonic):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = float(capacity if capacity is not None else rate_per_minute)
+        self._tokens = self.capacity
+        self._clock = clock
+        self._updated = clock()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, n=1):
+        """Tunggu sampai `n` token tersedia lalu ambil (FIFO lewat lock)."""
+        n = min(n, self.capacity)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= n:
+                    self._tokens -= n
+                    return
+                await asyncio.sleep((n - self._tokens) / self.rate)
+
+    def adjust(self, delta):
+        """Koreksi saldo (positif = kembalikan token, negatif = tagih lagi)."""
+        self._refill()
+        self._tokens = min(self.capacity, self._tokens + delta)
+
+
+class RateLimiter:
+    """Gabungan bucket requests/minute (rpm) dan tokens/minute (tpm)."""
+
+    def __init__(self, rpm=None, tpm=None):
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+
+    async def acquire(self, estimated_tokens):
+        if self.requests is not None:
+            await self.requests.acquire(1)
+        if self.tokens is not None:
+            await self.tokens.acquire(estimated_tokens)
+
+    def settle(self, estimated_tokens, actual_tokens):
+        """Sesuaikan bucket token dengan pemakaian sebenarnya."""
+        if self.tokens is not None and actual_tokens:
+            self.tokens.adjust(estimated_tokens - actual_tokens)
+
+
+def backoff_delay(attempt, base=0.5, cap=30.0, rng=random):
+    """Full-jitter exponential backoff: uniform(0, min(cap, base * 2^attempt))."""
+    return rng.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def encode_image(image, mime_type="image/png"):
+    """PIL image atau bytes -> (mime_type, base64 str) untuk `inline_data`."""
+    if isinstance(image, (bytes, bytearray)):
+        data = bytes(image)
+    else:
+        buf = io.BytesIO()
+        image.save(buf, format="PNG")
+        data = buf.getvalue()
+        mime_type = "image/png"
+    return mime_type, base64.b64encode(data).decode("ascii")
+
+
+def image_part(image, mime_type="image/png"):
+    """Part `inline_data` siap pakai; bangun sekali lalu pakai ulang per panggilan."""
+    mime_type, data = encode_image(image, mime_type)
+    return {"inline_data": {"mime_type": mime_type, "data": data}}
+
+
+# --- Client ---
+class AsyncExtractionClient:
+    """
+    Client async untuk tiga panggilan schema (metadata, monthly, totals).
+    Satu instance sebaiknya dipakai bersama untuk satu batch agar limiter
+    dan connection pool ikut terbagi.
+    """
+
+    def __init__(
+        self,
+        api_key,
+        model=DEFAULT_MODEL,
+        base_url=DEFAULT_BASE_URL,
+        rpm=None,
+        tpm=None,
+        max_connections=16,
+        max_retries=5,
+        deadline=120.0,
+        attempt_timeout=60.0,
+        backoff_base=0.5,
+        backoff_cap=30.0,
+        output_tokens=DEFAULT_OUTPUT_TOKENS,
+    ):
+        self.api_key = api_key
+        self.model = model
+        self.base_url = base_url.rstrip("/")
+        self.limiter = RateLimiter(rpm=rpm, tpm=tpm)
+        self.max_connections = max_connections
+        self.max_retries = max_retries
+        self.deadline = deadline
+        self.attempt_timeout = attempt_timeout
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.output_tokens = output_tokens
+        self._session = None
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def open(self):
+        if self._session is None:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections, keepalive_timeout=60, enable_cleanup_closed=True
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers={"x-goog-api-key": self.api_key} if self.api_key else None,
+            )
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    @property
+    def url(self):
+        return f"{self.base_url}/v1beta/models/{self.model}:generateContent"
+
+    def _estimate_tokens(self, prompt):
+        return IMAGE_TOKENS + len(prompt) // 4 + self.output_tokens
+
+    async def _post(self, body, timeout):
+        try:
+            async with self._session.post(
+                self.url, json=body, timeout=aiohttp.ClientTimeout(total=timeout)
+            ) as resp:
+                if resp.status in RETRYABLE_STATUS:
+                    retry_after = resp.headers.get("Retry-After")
+                    try:
+                        retry_after = float(retry_after) if retry_after else None
+                    except ValueError:
+                        retry_after = None
+                    raise _Retryable(f"HTTP {resp.status}", resp.status, retry_after)
+                if resp.status != 200:
+                    text = await resp.text()
+                    raise ExtractionError(f"HTTP {resp.status}: {text[:500]}", resp.status)
+                try:
+                    return await resp.json()
+                except (aiohttp.ContentTypeError, ValueError) as e:
+                    raise ExtractionError(f"HTTP 200 without a JSON body: {e}", resp.status) from e
+        except (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError) as e:
+            raise _Retryable(f"{type(e).__name__}: {e}") from e
+
+    async def generate(self, image, prompt, schema=None, label="", deadline=None):
+        """
+        Satu panggilan generateContent. Mengembalikan objek dengan `.text`,
+        `.usage_metadata` dan `.retries` (mirip hasil SDK).
+
+        `image` boleh PIL image, bytes, atau part dari `image_part` (tidak
+        di-encode ulang).
+        """
+        if self._session is None:
+            await self.open()
+        part = image if isinstance(image, dict) else image_part(image)
+        generation_config = {"responseMimeType": "application/json"}
+        if schema is not None:
+            generation_config["responseSchema"] = to_response_schema(schema)
+        body = {
+            "contents": [{
+                "role": "user",
+                "parts": [part, {"text": prompt}],
+            }],
+            "generationConfig": generation_config,
+        }
+
+        loop = asyncio.get_running_loop()
+        end = loop.time() + (deadline if deadline is not None else self.deadline)
+        estimated = self._estimate_tokens(prompt)
+
+        with metrics.span(metrics.GENERATE, label) as sp:
+            attempt = 0
+            while True:
+                remaining = end - loop.time()
+                if remaining <= 0:
+                    raise DeadlineExceeded(f"{label or 'request'}: deadline exceeded")
+                try:
+                    await asyncio.wait_for(self.limiter.acquire(estimated), remaining)
+                except asyncio.TimeoutError:
+                    raise DeadlineExceeded(f"{label or 'request'}: deadline exceeded waiting for quota")
+
+                remaining = end - loop.time()
+                try:
+                    payload = await self._post(body, min(self.attempt_timeout, max(remaining, 0.001)))
+                    break
+                except _Retryable as e:
+                    metrics.incr("retryable_errors", label)
+                    if attempt >= self.max_retries:
+                        raise ExtractionError(f"{label or 'request'}: {e} (retries exhausted)", e.status) from e
+                    delay = backoff_delay(attempt, self.backoff_base, self.backoff_cap)
+                    if e.retry_after is not None:
+                        delay = max(delay, e.retry_after)
+                    if loop.time() + delay >= end:
+                        raise DeadlineExceeded(f"{label or 'request'}: deadline exceeded after {e}") from e
+                    attempt += 1
+                    await asyncio.sleep(delay)
+
+            result = _to_result(payload, attempt)
+            usage = result.usage_metadata
+            self.limiter.settle(
+                estimated, (usage.prompt_token_count or 0) + (usage.candidates_token_count or 0)
+            )
+            metrics.observe_generate(label, result, sp, retries=attempt)
+        return result
+
+    async def extract(self, name, image, deadline=None):
+        """Satu ekstraksi bernama ("metadata" / "monthly" / "totals") -> JSON text."""
+        prompt, schema = EXTRACTIONS[name]
+        result = await self.generate(image, prompt, schema, label=name, deadline=deadline)
+        return result.text
+
+    async def extract_metadata(self, image, deadline=None):
+        return await self.extract("metadata", image, deadline)
+
+    async def extract_monthly(self, image, deadline=None):
+        return await self.extract("monthly", image, deadline)
+
+    async def extract_totals(self, image, deadline=None):
+        return await self.extract("totals", image, deadline)
+
+    async def extract_all(self, image, deadline=None):
+        """
+        Tiga ekstraksi secara paralel -> {"metadata", "monthly", "totals"}.
+        Bila satu gagal, sisanya dibatalkan dan error pertama dinaikkan.
+        """
+        # base64 once; the three request bodies share the same inline_data part
+        part = image if isinstance(image, dict) else image_part(image)
+        names = list(EXTRACTIONS)
+        tasks = [asyncio.ensure_future(self.extract(n, part, deadline)) for n in names]
+        try:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        finally:
+            # also reached when extract_all itself is cancelled
+            for t in tasks:
+                if not t.done():
+                    t.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        for t in done:
+            if t.exception() is not None:
+                raise t.exception()
+        return {name: t.result() for name, t in zip(names, tasks)}
+
+
+def _to_result(payload, retries):
+    try:
+        parts = payload["candidates"][0]["content"]["parts"]
+        text = "".join(p.get("text", "") for p in parts)
+    except (KeyError, IndexError, TypeError) as e:
+        raise ExtractionError(f"Respons tanpa kandidat: {json.dumps(payload)[:500]}") from e
+    usage = payload.get("usageMetadata", {})
+    return SimpleNamespace(
+        text=text,
+        retries=retries,
+        usage_metadata=SimpleNamespace(
+            prompt_token_count=usage.get("promptTokenCount", 0),
+            candidates_token_count=usage.get("candidatesTokenCount", 0),
+        ),
+    )
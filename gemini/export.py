@@ -0,0 +1,371 @@
+# gemini/export.py
+"""
+Bulk export: bundle ZIP streaming, CSV lebar, dan NetCDF gaya CF.
+
+Satu "page" adalah dict hasil pipeline: `name`, `metadata`, `monthly`,
+`totals` dan opsional `png` (bytes). Semua writer menerima iterable page
+(boleh generator, mis. `iter_output_dirs`) dan menulis per page, jadi
+batch besar tidak perlu dimuat sekaligus ke memori (NetCDF: lihat
+`write_netcdf` soal `years`).
+
+Stasiun di CSV / NetCDF diidentifikasi lewat metadata (`station_key`),
+sehingga beberapa halaman dari stasiun yang sama bergabung; nama page
+(folder) hanya dipakai untuk folder di ZIP.
+
+    with open("batch.zip", "wb") as f:
+        write_zip(f, iter_output_dirs(dirs))
+"""
+import csv
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+import zipfile
+from collections import OrderedDict
+
+from gemini.pipeline import OUTPUT_FILES
+
+MONTH_ABBR = ["Jan", "Feb", "Mar", "Apr", "May", "Jun",
+              "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+MONTH_NAMES = ["January", "February", "March", "April", "May", "June",
+               "July", "August", "September", "October", "November", "December"]
+
+
+def _station_meta(page):
+    meta = page.get("metadata") or {}
+    return meta.get("station", meta)
+
+
+def page_name(page):
+    """Nama page untuk folder di ZIP."""
+    if page.get("name"):
+        return str(page["name"])
+    meta = _station_meta(page)
+    return str(meta.get("Location") or meta.get("StationNumber") or "page")
+
+
+def station_key(page):
+    """
+    Identitas stasiun untuk CSV / NetCDF: `StationNumber` dari metadata,
+    lalu `Location`, dan baru nama page bila metadata kosong.
+    """
+    meta = _station_meta(page)
+    for field in ("StationNumber", "Location"):
+        value = meta.get(field)
+        if value not in (None, "", "-"):
+            return str(value).strip()
+    return page_name(page)
+
+
+def iter_output_dirs(dirs, keys=None):
+    """
+    Baca folder keluaran `write_outputs` satu per satu (lazy).
+    `keys` membatasi file yang dibaca, mis. ("metadata", "monthly") agar
+    PNG tidak ikut dimuat untuk CSV / NetCDF.
+    """
+    wanted = OUTPUT_FILES if keys is None else {k: OUTPUT_FILES[k] for k in keys}
+    for d in dirs:
+        page = {"name": os.path.basename(os.path.normpath(d))}
+        for key, fname in wanted.items():
+            path = os.path.join(d, fname)
+            if not os.path.exists(path):
+                continue
+            if key == "png":
+                with open(path, "rb") as f:
+                    page[key] = f.read()
+            else:
+                with open(path, "r") as f:
+                    page[key] = json.load(f)
+        yield page
+
+
+# --- ZIP ---
+def _zipinfo(arcname, compress_type=zipfile.ZIP_DEFLATED):
+    info = zipfile.ZipInfo(arcname, date_time=time.localtime()[:6])
+    info.compress_type = compress_type
+    info.external_attr = 0o644 << 16
+    return info
+
+
+def _write_json_member(zf, arcname, obj):
+    # json.dump writes in chunks straight into the compressed member
+    with zf.open(_zipinfo(arcname), "w") as raw:
+        with io.TextIOWrapper(raw, encoding="utf-8") as f:
+            json.dump(obj, f, indent=2)
+
+
+def _write_page(zf, page, prefix):
+    for key, fname in OUTPUT_FILES.items():
+        value = page.get(key)
+        if value is None:
+            continue
+        if key == "png":
+            # PNG sudah terkompresi
+            zf.writestr(_zipinfo(prefix + fname, zipfile.ZIP_STORED), value)
+        else:
+            _write_json_member(zf, prefix + fname, value)
+
+
+def _prefixes(pages, single):
+    """(page, folder prefix); nama ganda -> name_2, name_3, ..."""
+    seen = {}
+    for page in pages:
+        if single:
+            yield page, ""
+            continue
+        name = page_name(page)
+        seen[name] = seen.get(name, 0) + 1
+        if seen[name] > 1:
+            name = f"{name}_{seen[name]}"
+        yield page, name + "/"
+
+
+def write_zip(fileobj, pages, single=False):
+    """
+    Tulis bundle ZIP (metadata/monthly/totals/plot) ke `fileobj`.
+
+    Tiap page masuk folder `<name>/`, kecuali `single=True` (satu page,
+    file langsung di root). `fileobj` tidak harus seekable, jadi bisa
+    berupa response/pipe; anggota ditulis bertahap.
+    """
+    with zipfile.ZipFile(fileobj, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for page, prefix in _prefixes(pages, single):
+            _write_page(zf, page, prefix)
+    return fileobj
+
+
+class _ChunkSink:
+    """File-like tak-seekable yang mengumpulkan potongan untuk di-yield."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, b):
+        self.chunks.append(bytes(b))
+        return len(b)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        out, self.chunks = self.chunks, []
+        return out
+
+
+def iter_zip(pages, single=False):
+    """Generator potongan bytes ZIP, dikeluarkan setiap selesai satu page."""
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for page, prefix in _prefixes(pages, single):
+            _write_page(zf, page, prefix)
+            yield from sink.drain()
+    # central directory
+    yield from sink.drain()
+
+
+def zip_bytes(pages, single=False):
+    """Bundle ZIP lengkap sebagai bytes (untuk st.download_button)."""
+    buf = io.BytesIO()
+    write_zip(buf, pages, single)
+    return buf.getvalue()
+
+
+# --- CSV ---
+CSV_HEADER = ["station", "year"] + MONTH_ABBR + ["total"]
+
+
+def _month_values(year_block):
+    by_name = {m.get("Month"): m.get("rainfall") for m in year_block.get("rainfall", [])}
+    return [by_name.get(m, by_name.get(m[:3], "-")) for m in MONTH_NAMES]
+
+
+def _year_order(year):
+    return (0, year) if isinstance(year, int) else (1, str(year))
+
+
+def iter_csv_rows(pages):
+    """
+    Baris CSV lebar: station, year, Jan..Dec, total ("" = kosong), satu
+    baris per (stasiun, tahun). Page dari stasiun yang sama digabung seperti
+    di NetCDF: nilai baru menimpa hanya bila tidak kosong. Karena itu baris
+    baru keluar setelah semua page dibaca; yang ditahan hanya angka (tanpa
+    PNG), stasiun sesuai urutan kemunculan dan tahun diurutkan.
+    """
+    merged = {}  # station -> {year: Jan..Dec + total}
+    for page in pages:
+        rows = merged.setdefault(station_key(page), {})
+        totals = {
+            t.get("Year"): t.get("Total")
+            for t in (page.get("totals") or {}).get("Totals", [])
+        }
+        for yb in (page.get("monthly") or {}).get("rainfall", []):
+            year = yb.get("Year")
+            values = [
+                "" if v in ("-", None) else v
+                for v in _month_values(yb) + [totals.get(year)]
+            ]
+            old = rows.get(year)
+            rows[year] = values if old is None else [o if v == "" else v for o, v in zip(old, values)]
+    for station, rows in merged.items():
+        for year in sorted(rows, key=_year_order):
+            yield [station, year] + rows[year]
+
+
+def write_wide_csv(fileobj, pages):
+    """Tulis CSV lebar ke file teks (page digabung per stasiun & tahun)."""
+    writer = csv.writer(fileobj)
+    writer.writerow(CSV_HEADER)
+    for row in iter_csv_rows(pages):
+        writer.writerow(row)
+    return fileobj
+
+
+def csv_bytes(pages):
+    buf = io.StringIO()
+    write_wide_csv(buf, pages)
+    return buf.getvalue().encode("utf-8")
+
+
+# --- NetCDF (CF) ---
+def year_range(pages):
+    """(tahun pertama, tahun terakhir) dari `monthly` semua page, atau None."""
+    first = last = None
+    for page in pages:
+        for yb in (page.get("monthly") or {}).get("rainfall", []):
+            year = yb.get("Year")
+            if not isinstance(year, int):
+                continue
+            first = year if first is None else min(first, year)
+            last = year if last is None else max(last, year)
+    return None if first is None else (first, last)
+
+
+def write_netcdf(path, pages, years=None, chunk_stations=256, units="in", fill_value=-999.0):
+    """
+    Tulis NetCDF4 gaya CF: `precipitation(station, time)` bulanan, dengan
+    `time` = awal bulan tahun `years[0]..years[1]` ("days since 1800-01-01",
+    kalender standar) dan `station` unlimited.
+
+    Tiap page langsung ditulis ke baris stasiunnya (`station_key`); page
+    dari stasiun yang sama digabung, nilai baru menimpa hanya bila tidak
+    kosong. Memori yang dipakai hanya satu page + indeks stasiun, *asal*
+    `years` diberikan (mis. dari `year_range` pada bacaan pertama yang
+    ringan). Tanpa `years`, semua page dimuat dulu ke memori untuk
+    menentukan sumbu waktu. Butuh paket opsional `netCDF4`.
+    """
+    try:
+        import netCDF4
+    except ImportError as e:
+        raise ImportError("NetCDF export needs the optional 'netCDF4' package (pip install netCDF4)") from e
+    import datetime
+
+    import numpy as np
+
+    from gemini.analytics import monthly_to_array
+
+    if years is None:
+        # the time axis has to be known before the first write
+        pages = list(pages)
+        years = year_range(pages)
+    first, last = years if years is not None else (1800, 1799)
+    n_time = (last - first + 1) * 12
+
+    epoch = datetime.date(1800, 1, 1)
+    times = np.array(
+        [(datetime.date(y, m, 1) - epoch).days for y in range(first, last + 1) for m in range(1, 13)],
+        dtype=np.float64,
+    )
+
+    with netCDF4.Dataset(path, "w", format="NETCDF4") as ds:
+        ds.Conventions = "CF-1.8"
+        ds.title = "Digitised monthly rainfall registers"
+        ds.featureType = "timeSeries"
+        ds.source = "OCR (Gemini) + gemini.clean"
+
+        ds.createDimension("station", None)
+        ds.createDimension("time", n_time)
+
+        t = ds.createVariable("time", "f8", ("time",))
+        t.standard_name = "time"
+        t.units = "days since 1800-01-01"
+        t.calendar = "standard"
+        t.long_name = "start of month"
+        t[:] = times
+
+        name = ds.createVariable("station_id", str, ("station",))
+        name.cf_role = "timeseries_id"
+        name.long_name = "station number (or location when unnumbered)"
+        location = ds.createVariable("station_location", str, ("station",))
+        location.long_name = "station location"
+
+        chunks = (max(1, chunk_stations), max(1, min(n_time, 120)))
+        pr = ds.createVariable(
+            "precipitation", "f4", ("station", "time"),
+            zlib=True, complevel=4, chunksizes=chunks, fill_value=fill_value,
+        )
+        pr.standard_name = "lwe_thickness_of_precipitation_amount"
+        pr.long_name = "monthly rainfall"
+        pr.units = units
+        pr.cell_methods = "time: sum"
+        pr.coordinates = "station_id station_location"
+
+        rows = {}  # station_key -> row
+        for page in pages:
+            key = station_key(page)
+            row = rows.get(key)
+            merge = row is not None
+            if row is None:
+                row = rows[key] = len(rows)
+                name[row] = key
+                location[row] = str(_station_meta(page).get("Location") or "")
+            page_years, values = monthly_to_array(page.get("monthly") or {})
+            if not len(page_years):
+                continue
+            lo, hi = int(page_years[0]), int(page_years[-1])
+            if lo < first or hi > last:
+                raise ValueError(f"{page_name(page)}: years {lo}-{hi} outside the time axis {first}-{last}")
+            block = np.full((hi - lo + 1, 12), np.nan)
+            block[page_years - lo] = values
+            block = block.reshape(-1)
+            start = (lo - first) * 12
+            stop = start + block.size
+            if merge:
+                old = np.ma.filled(pr[row, start:stop].astype(np.float64), np.nan)
+                block = np.where(np.isnan(block), old, block)
+            pr[row, start:stop] = np.where(np.isnan(block), fill_value, block).astype("f4")
+    return path
+
+
+# --- Cache export bytes by content hash ---
+def content_hash(*parts):
+    """Hash isi page (bytes / str) untuk kunci cache export."""
+    h = hashlib.sha1()
+    for p in parts:
+        h.update(p if isinstance(p, bytes) else str(p).encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+class ExportCache:
+    """LRU kecil `(key, kind) -> bytes` agar rerun tidak serialisasi ulang."""
+
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, kind, build):
+        k = (key, kind)
+        with self._lock:
+            if k in self._data:
+                self._data.move_to_end(k)
+                return self._data[k]
+        value = build()
+        with self._lock:
+            self._data[k] = value
+            self._data.move_to_end(k)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+        return value
@@ -0,0 +1,75 @@
+# gemini/extract.py
+"""
+Ekstraksi Gemini (SDK `google.generativeai`, transport REST).
+
+`google.generativeai` dan `dotenv` baru di-import saat panggilan pertama,
+jadi `import gemini.extract` tetap murah untuk job yang hanya cleaning.
+Setiap fungsi mengembalikan teks JSON mentah dari model.
+"""
+import os
+import threading
+
+from gemini import metrics
+from gemini.schemas import DEFAULT_MODEL, EXTRACTIONS, STATION_PROMPT
+
+_models = {}
+_lock = threading.Lock()
+
+
+def _genai():
+    """Import & konfigurasi `google.generativeai` sekali (lazy)."""
+    import google.generativeai as genai
+
+    with _lock:
+        if not getattr(_genai, "configured", False):
+            from dotenv import load_dotenv
+
+            load_dotenv()
+            genai.configure(api_key=os.getenv("GOOGLE_API_KEY"), transport="rest")
+            _genai.configured = True
+    return genai
+
+
+def get_model(model_name=DEFAULT_MODEL):
+    """`GenerativeModel` yang di-cache per nama model."""
+    model = _models.get(model_name)
+    if model is None:
+        genai = _genai()
+        with _lock:
+            model = _models.setdefault(model_name, genai.GenerativeModel(model_name))
+    return model
+
+
+def _generate(label, contents, schema=None, model=None):
+    model = model or get_model()
+    # plain dict config: accepted by the SDK and by offline fake models
+    config = {"response_mime_type": "application/json"}
+    if schema is not None:
+        config["response_schema"] = schema
+    with metrics.span(metrics.GENERATE, label) as sp:
+        result = model.generate_content(contents, generation_config=config)
+        metrics.observe_generate(label, result, sp)
+    return result.text
+
+
+def extract(name, img, model=None):
+    """Satu ekstraksi ber-schema: "metadata", "monthly" atau "totals"."""
+    prompt, schema = EXTRACTIONS[name]
+    return _generate(name, [img, "\n\n", prompt], schema, model)
+
+
+def extract_metadata(img, model=None):
+    return extract("metadata", img, model)
+
+
+def extract_monthly(img, model=None):
+    return extract("monthly", img, model)
+
+
+def extract_totals(img, model=None):
+    return extract("totals", img, model)
+
+
+def extract_station_metadata(img, model=None):
+    """Metadata stasiun tanpa schema, berbentuk {"station": {...}}."""
+    return _generate("metadata_station", [img, STATION_PROMPT], model=model)
@@ -0,0 +1,334 @@
+# gemini/metrics.py
+"""
+Per-stage timing & token instrumentation.
+
+Usage:
+    from gemini import metrics
+    metrics.enable()
+    with metrics.span("clean_gemini_json"):
+        ...
+    metrics.observe_generate("monthly", result, retries=0)
+    metrics.export_prometheus("metrics.prom")
+
+When disabled (default, unless RAINFALL_METRICS=1) `span` returns a shared
+no-op context manager, so the hot path only pays one context lookup.
+
+Histogram & counter bersifat global (per proses). Flag aktif dan breakdown
+`last_run` milik sebuah `Run`; tiap sesi / thread bisa memasang `Run`
+sendiri lewat `activate` / `use_run` (contextvar), sehingga sesi lain tidak
+ikut menyala atau kehilangan breakdown-nya. Tanpa `Run` terpasang dipakai
+run default proses (`enable()` mengatur flag-nya; CLI & skrip).
+"""
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Stage names used across the pipeline (one histogram per stage/label)
+IMAGE_LOAD = "image_load"
+PREPROCESS = "preprocess"
+GENERATE = "generate_content"
+CLEAN_MONTHLY = "clean_gemini_json"
+CLEAN_TOTALS = "clean_totals_json"
+RENDER = "render"
+SAVEFIG = "savefig"
+
+# Prometheus-style latency buckets in seconds
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_lock = threading.Lock()
+
+
+class Histogram:
+    """Histogram kumulatif sederhana (bucket, sum, count)."""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.sum += value
+        self.count += 1
+        for i, upper in enumerate(self.buckets):
+            if value <= upper:
+                self.counts[i] += 1
+                break
+
+    def cumulative(self):
+        out, running = [], 0
+        for c in self.counts:
+            running += c
+            out.append(running)
+        return out
+
+    def to_dict(self):
+        return {
+            "buckets": list(self.buckets),
+            "counts": self.cumulative(),
+            "sum": self.sum,
+            "count": self.count,
+        }
+
+
+_histograms = {}  # (stage, label) -> Histogram
+_counters = {}    # (name, label) -> number
+
+
+class Run:
+    """Flag aktif + breakdown satu run (mis. satu sesi Streamlit)."""
+
+    __slots__ = ("enabled", "entries", "_lock")
+
+    def __init__(self, enabled=True):
+        self.enabled = bool(enabled)
+        self.entries = []  # list of {"stage", "label", "seconds", ...}
+        self._lock = threading.Lock()
+
+    def append(self, entry):
+        with self._lock:
+            self.entries.append(entry)
+
+    def extend(self, entries):
+        with self._lock:
+            self.entries.extend(dict(e) for e in entries)
+
+    def start(self, keep=()):
+        with self._lock:
+            self.entries[:] = [e for e in self.entries if e["stage"] in keep]
+
+    def last(self):
+        with self._lock:
+            return [dict(e) for e in self.entries]
+
+
+_default_run = Run(os.getenv("RAINFALL_METRICS", "").lower() in ("1", "true", "yes"))
+_current = contextvars.ContextVar("rainfall_metrics_run", default=None)
+
+
+def current_run():
+    """`Run` yang aktif di konteks ini (atau run default proses)."""
+    return _current.get() or _default_run
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+class _Span:
+    __slots__ = ("stage", "label", "attrs", "run", "_t0")
+
+    def __init__(self, stage, label, run):
+        self.stage = stage
+        self.label = label
+        self.attrs = {}
+        self.run = run
+
+    def set(self, **attrs):
+        """Tambahkan atribut (mis. token) ke entri breakdown run ini."""
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self._t0
+        entry = {"stage": self.stage, "label": self.label, "seconds": elapsed}
+        if exc_type is not None:
+            entry["error"] = exc_type.__name__
+        entry.update(self.attrs)
+        key = (self.stage, self.label)
+        with _lock:
+            hist = _histograms.get(key)
+            if hist is None:
+                hist = _histograms[key] = Histogram()
+            hist.observe(elapsed)
+            if exc_type is not None:
+                _counters[("errors", self.stage)] = _counters.get(("errors", self.stage), 0) + 1
+        self.run.append(entry)
+        return False
+
+
+# --- Public API ---
+def enable(flag=True):
+    """Atur flag run default proses (dipakai bila tidak ada `Run` terpasang)."""
+    _default_run.enabled = bool(flag)
+
+
+def disable():
+    enable(False)
+
+
+def is_enabled():
+    return current_run().enabled
+
+
+def activate(run):
+    """
+    Pasang `run` untuk konteks ini (thread / task) sampai diganti.
+    Mengembalikan token untuk `deactivate`.
+    """
+    return _current.set(run)
+
+
+def deactivate(token):
+    _current.reset(token)
+
+
+@contextmanager
+def use_run(run):
+    """`with use_run(Run()) as r:` -- span di dalam blok tercatat ke `r`."""
+    token = _current.set(run)
+    try:
+        yield run
+    finally:
+        _current.reset(token)
+
+
+def span(stage, label=""):
+    """Context manager pengukur durasi satu stage (no-op bila nonaktif)."""
+    run = _current.get() or _default_run
+    if not run.enabled:
+        return _NOOP
+    return _Span(stage, label, run)
+
+
+def incr(name, label="", value=1):
+    """Tambah counter (mis. jumlah retry / token)."""
+    if not (_current.get() or _default_run).enabled:
+        return
+    key = (name, label)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def observe_generate(label, result, sp=_NOOP, retries=0):
+    """
+    Catat token & retry dari satu hasil `generate_content`.
+    `sp` adalah span aktif agar token ikut tampil di breakdown run.
+    """
+    if not (_current.get() or _default_run).enabled:
+        return
+    usage = getattr(result, "usage_metadata", None)
+    prompt_tokens = getattr(usage, "prompt_token_count", 0) or 0
+    output_tokens = getattr(usage, "candidates_token_count", 0) or 0
+    sp.set(prompt_tokens=prompt_tokens, output_tokens=output_tokens, retries=retries)
+    incr("prompt_tokens", label, prompt_tokens)
+    incr("output_tokens", label, output_tokens)
+    incr("retries", label, retries)
+    incr("requests", label, 1)
+
+
+def start_run(keep=()):
+    """
+    Mulai run baru: kosongkan breakdown `last_run` run aktif (histogram tetap).
+    Entri dengan stage di `keep` dipertahankan (mis. image load yang di-cache).
+    """
+    current_run().start(keep)
+
+
+def last_run():
+    return current_run().last()
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
+    current_run().start()
+
+
+def snapshot():
+    """Salinan semua metrik sebagai dict yang bisa di-JSON-kan."""
+    with _lock:
+        return {
+            "stages": [
+                {"stage": stage, "label": label, **hist.to_dict()}
+                for (stage, label), hist in sorted(_histograms.items())
+            ],
+            "counters": [
+                {"name": name, "label": label, "value": value}
+                for (name, label), value in sorted(_counters.items())
+            ],
+            "last_run": last_run(),
+        }
+
+
+# --- Export ---
+def _labels(**labels):
+    parts = [f'{k}="{v}"' for k, v in labels.items() if v != ""]
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def to_prometheus(prefix="rainfall"):
+    """Render metrik dalam format teks Prometheus (exposition format)."""
+    snap = snapshot()
+    lines = [
+        f"# HELP {prefix}_stage_seconds Duration of pipeline stages.",
+        f"# TYPE {prefix}_stage_seconds histogram",
+    ]
+    for s in snap["stages"]:
+        for upper, cum in zip(s["buckets"], s["counts"]):
+            lines.append(
+                f"{prefix}_stage_seconds_bucket"
+                f"{_labels(stage=s['stage'], label=s['label'], le=upper)} {cum}"
+            )
+        lines.append(
+            f"{prefix}_stage_seconds_bucket"
+            f"{_labels(stage=s['stage'], label=s['label'], le='+Inf')} {s['count']}"
+        )
+        lines.append(f"{prefix}_stage_seconds_sum{_labels(stage=s['stage'], label=s['label'])} {s['sum']}")
+        lines.append(f"{prefix}_stage_seconds_count{_labels(stage=s['stage'], label=s['label'])} {s['count']}")
+
+    seen = set()
+    for c in snap["counters"]:
+        name = f"{prefix}_{c['name']}_total"
+        if name not in seen:
+            lines.append(f"# TYPE {name} counter")
+            seen.add(name)
+        lines.append(f"{name}{_labels(label=c['label'])} {c['value']}")
+    return "\n".join(lines) + "\n"
+
+
+def export_prometheus(path, prefix="rainfall"):
+    """Tulis file teks Prometheus (untuk node_exporter textfile collector)."""
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        f.write(to_prometheus(prefix))
+    os.replace(tmp, path)
+
+
+def export_json(path):
+    with open(path, "w") as f:
+        json.dump(snapshot(), f, indent=2)
+
+
+@contextmanager
+def exporting(prom_path=None, json_path=None):
+    """Ekspor metrik ke file di akhir blok (juga bila error), bila aktif."""
+    try:
+        yield
+    finally:
+        if is_enabled():
+            if prom_path:
+                export_prometheus(prom_path)
+            if json_path:
+                export_json(json_path)
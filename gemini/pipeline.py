@@ -0,0 +1,111 @@
+# gemini/pipeline.py
+"""
+Pipeline satu halaman: load gambar -> ekstraksi -> cleaning -> plot.
+
+Modul berat (PIL, google.generativeai, matplotlib) hanya di-import pada
+langkah yang memakainya; `clean_page` / `clean_files` cukup stdlib.
+
+    from gemini.pipeline import load_image, process_page
+    result = process_page(load_image("page1.png"))
+    result["monthly"], result["totals"], result["png"]
+"""
+import json
+import os
+
+from gemini import metrics
+from gemini.clean import clean_gemini_json, clean_totals_json
+
+# nama file keluaran (sama dengan tombol download di app.py)
+OUTPUT_FILES = {
+    "metadata": "metadata.json",
+    "monthly": "monthly.json",
+    "totals": "totals.json",
+    "png": "rainfall_plot.png",
+}
+
+
+def load_image(path_or_file):
+    """Buka gambar sebagai RGB (PIL di-import di sini)."""
+    import PIL.Image
+
+    with metrics.span(metrics.IMAGE_LOAD):
+        img = PIL.Image.open(path_or_file)
+        img.load()
+    with metrics.span(metrics.PREPROCESS):
+        return img.convert("RGB")
+
+
+def extract_page(img, model=None):
+    """Tiga ekstraksi ber-schema -> {"metadata", "monthly", "totals"} (teks JSON)."""
+    from gemini.extract import extract
+
+    return {name: extract(name, img, model) for name in ("metadata", "monthly", "totals")}
+
+
+def clean_page(raw):
+    """Teks/dict mentah hasil ekstraksi -> (metadata, monthly, totals) bersih."""
+    def parse(v):
+        return json.loads(v) if isinstance(v, (str, bytes)) else v
+
+    metadata = parse(raw["metadata"])
+    with metrics.span(metrics.CLEAN_MONTHLY):
+        monthly = clean_gemini_json(parse(raw["monthly"]))
+    with metrics.span(metrics.CLEAN_TOTALS):
+        totals = clean_totals_json(parse(raw["totals"]), monthly)
+    return metadata, monthly, totals
+
+
+def render_png(img, metadata, monthly, totals, dpi=200):
+    """Render plot perbandingan ke bytes PNG."""
+    import io
+
+    from gemini.plot import generate_plot
+
+    with metrics.span(metrics.RENDER):
+        fig = generate_plot(img, metadata, monthly, totals)
+    buf = io.BytesIO()
+    with metrics.span(metrics.SAVEFIG):
+        fig.savefig(buf, format="png", dpi=dpi, bbox_inches="tight")
+    return buf.getvalue()
+
+
+def process_page(img, model=None, plot=True, dpi=200):
+    """
+    Alur lengkap satu halaman. Mengembalikan dict `metadata`, `monthly`,
+    `totals` dan `png` (bytes, atau None bila `plot=False`).
+    """
+    metadata, monthly, totals = clean_page(extract_page(img, model))
+    png = render_png(img, metadata, monthly, totals, dpi=dpi) if plot else None
+    return {"metadata": metadata, "monthly": monthly, "totals": totals, "png": png}
+
+
+def clean_files(monthly_path, totals_path=None):
+    """Cleaning saja dari file JSON mentah -> (monthly, totals | None)."""
+    with open(monthly_path, "r") as f:
+        with metrics.span(metrics.CLEAN_MONTHLY):
+            monthly = clean_gemini_json(json.load(f))
+    totals = None
+    if totals_path:
+        with open(totals_path, "r") as f:
+            with metrics.span(metrics.CLEAN_TOTALS):
+                totals = clean_totals_json(json.load(f), monthly_data=monthly)
+    return monthly, totals
+
+
+def write_outputs(result, out_dir):
+    """Tulis metadata/monthly/totals (JSON) dan plot (PNG) ke `out_dir`."""
+    os.makedirs(out_dir, exist_ok=True)
+    written = []
+    for key, name in OUTPUT_FILES.items():
+        value = result.get(key)
+        if value is None:
+            continue
+        path = os.path.join(out_dir, name)
+        if key == "png":
+            with open(path, "wb") as f:
+                f.write(value)
+        else:
+            with open(path, "w") as f:
+                json.dump(value, f, indent=2)
+        written.append(path)
+    return written
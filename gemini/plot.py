@@ -0,0 +1,188 @@
+# gemini/plot.py
+"""
+Plot perbandingan: gambar asli + metadata + tabel hasil digitasi + totals.
+
+matplotlib di-import di dalam `generate_plot` supaya modul ini murah di-import.
+"""
+
+
+def generate_plot(img, metadata, mo, totals):
+    """
+    Buat Figure: gambar di kiri, metadata kanan atas, angka bulanan di tengah
+    dan totals di bawah. `metadata` boleh berbentuk {"station": {...}} atau
+    langsung dict stasiun.
+    """
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvas
+
+    # Create the figure
+    fig = Figure(
+        figsize=(13, 10),  # Width, Height (inches)
+        dpi=100,
+        facecolor=(0.95, 0.95, 0.95, 1),
+        edgecolor=None,
+        linewidth=0.0,
+        frameon=True,
+        subplotpars=None,
+        tight_layout=None,
+    )
+    canvas = FigureCanvas(fig)
+
+    # Image in the left
+    ax_original = fig.add_axes([0.01, 0.02, 0.47, 0.96])
+    ax_original.set_axis_off()
+    imgplot = ax_original.imshow(img, zorder=10)
+
+
+    station = metadata.get("station", metadata)
+
+    # Metadata top right
+    ax_metadata = fig.add_axes([0.52, 0.8, 0.47, 0.15])
+    ax_metadata.set_xlim(0, 1)
+    ax_metadata.set_ylim(0, 1)
+    ax_metadata.set_xticks([])
+    ax_metadata.set_yticks([])
+
+
+    ax_metadata.text(
+        0.05,
+        0.8,
+        f"Station Number: {station.get('StationNumber', '-')}",
+        fontsize=12,
+        color="black",
+    )
+
+    ax_metadata.text(
+        0.05,
+        0.7,
+        f"Location: {station.get('Location', '-')}",
+        fontsize=12,
+        color="black",
+    )
+    ax_metadata.text(
+        0.05,
+        0.6,
+        f"Observer: {station.get ('Observer', '-')}",
+        fontsize=12,
+        color="black",
+    )
+    ax_metadata.text(
+        0.05,
+        0.5,
+        f"County: {station.get ('County', '-')}",
+        fontsize=12,
+        color="black",
+    )
+    ax_metadata.text(
+        0.05,
+        0.4,
+        f"River Basin: {station.get ('River_basin', '-')}",
+        fontsize=12,
+        color="black",
+    )
+    ax_metadata.text(
+        0.05,
+        0.3,
+        f"Type of Gauge:{station.get ('Type_of_gauge', '-')}",
+        fontsize=12,
+        color="black",
+    )
+
+    years = []
+    for year in mo["rainfall"]:
+        years.append(year["Year"])
+    years = sorted(years)
+
+    # Digitised numbers on the right
+    ax_digitised = fig.add_axes([0.52, 0.13, 0.47, 0.63])
+    ax_digitised.set_xlim(years[0] - 0.5, years[-1] + 0.5)
+    ax_digitised.set_xticks(range(years[0], years[-1] + 1))
+    ax_digitised.set_xticklabels(years)
+    ax_digitised.set_ylim(0.5, 12.5)
+    ax_digitised.set_yticks(range(1, 13))
+    ax_digitised.set_yticklabels(
+        (
+            "Jan",
+            "Feb",
+            "Mar",
+            "Apr",
+            "May",
+            "Jun",
+            "Jul",
+            "Aug",
+            "Sep",
+            "Oct",
+            "Nov",
+            "Dec",
+        )
+    )
+    ax_digitised.xaxis.set_ticks_position("top")
+    ax_digitised.xaxis.set_label_position("top")
+    ax_digitised.invert_yaxis()
+    ax_digitised.set_aspect("auto")
+
+    monthNumbers = {
+        "Jan": 1,
+        "January": 1,
+        "Feb": 2,
+        "February": 2,
+        "Mar": 3,
+        "March": 3,
+        "Apr": 4,
+        "April": 4,
+        "May": 5,
+        "Jun": 6,
+        "June": 6,
+        "Jul": 7,
+        "July": 7,
+        "Aug": 8,
+        "August": 8,
+        "Sep": 9,
+        "September": 9,
+        "Oct": 10,
+        "October": 10,
+        "Nov": 11,
+        "November": 11,
+        "Dec": 12,
+        "December": 12,
+    }
+    for year in mo["rainfall"]:
+        for month in year["rainfall"]:
+            ax_digitised.text(
+                year["Year"],
+                monthNumbers[month["Month"]],
+                month["rainfall"],
+                ha="center",
+                va="center",
+                fontsize=12,
+                color="black",
+            )
+
+
+    # Totals along the bottom
+    # Samakan skala sumbu X dengan tabel utama (pakai tahun, bukan indeks)
+    ax_totals = fig.add_axes([0.52, 0.09, 0.47, 0.03])
+
+    ax_totals.set_xlim(years[0] - 0.5, years[-1] + 0.5)
+    ax_totals.set_xticks(range(years[0], years[-1] + 1))
+    ax_totals.set_xticklabels([])  # supaya tidak menampilkan tahun dua kali
+    ax_totals.set_ylim(0, 1)
+    ax_totals.set_yticks([])
+
+    # Tampilkan angka total sesuai tahun
+    for t in totals["Totals"]:
+        year = t["Year"]
+        total_val = t["Total"]
+
+        if year in years:  # pastikan hanya tahun yang tampil di tabel
+            ax_totals.text(
+                year,
+                0.5,
+                str(total_val),
+                ha="center",
+                va="center",
+                fontsize=12,
+                color="black",
+            )
+
+    return fig
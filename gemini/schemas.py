@@ -0,0 +1,101 @@
+# gemini/schemas.py
+"""
+Struktur data (response schema) & prompt untuk tiga panggilan ekstraksi.
+
+Dipakai bersama oleh script (SDK `google.generativeai`) dan client REST
+async (`gemini.client`), yang butuh schema dalam bentuk OpenAPI dict.
+"""
+import typing
+
+from typing_extensions import TypedDict, get_type_hints, is_typeddict
+
+
+DEFAULT_MODEL = "gemini-2.5-flash-preview-09-2025"
+
+
+# --- DEFINISI STRUKTUR DATA ---
+class MetaData(TypedDict):
+    Year: int
+    StationNumber: int
+    Location: str
+    County: str
+    River_basin: str
+    Type_of_gauge: str
+    Observer: str
+
+class Monthly(TypedDict):
+    Month: str
+    rainfall: str
+
+class Annual(TypedDict):
+    Year: int
+    rainfall: list[Monthly]
+
+class Decadal(TypedDict):
+    rainfall: list[Annual]
+
+class Totals(TypedDict):
+    Totals: list[str]
+
+
+# --- PROMPT ---
+METADATA_PROMPT = "List the station metadata"
+
+MONTHLY_PROMPT = (
+    "List the monthly rainfall observations from the image. "
+    "The table likely covers around 10 consecutive years (e.g., 1890–1899). "
+    "If some years are missing or unclear, still include them with rainfall='-' "
+    "and include all 12 months (January–December)."
+)
+
+TOTALS_PROMPT = "List the annual totals."
+
+# Metadata tanpa schema, dibungkus {"station": {...}} (dipakai untuk plot)
+STATION_PROMPT = """
+        Extract the station metadata from the rainfall register image.
+
+        Output as JSON using this schema:
+        {
+        station :
+        {
+          "StationNumber": int | null,
+          "Location": string,
+          "County": string,
+          "River_basin": string | null,
+          "Type_of_gauge": string | null,
+          "Observer": string
+        }}
+
+        Notes:
+        - Location appears after "RAIN FALL AT".
+        - County is after "County of".
+        - Observer name appears after "Observer".
+        - If any numeric value is unclear or missing, use null.
+        """
+
+# name -> (prompt, schema) untuk tiga panggilan ekstraksi
+EXTRACTIONS = {
+    "metadata": (METADATA_PROMPT, MetaData),
+    "monthly": (MONTHLY_PROMPT, Decadal),
+    "totals": (TOTALS_PROMPT, Totals),
+}
+
+
+_SCALARS = {int: "INTEGER", float: "NUMBER", str: "STRING", bool: "BOOLEAN"}
+
+
+def to_response_schema(tp):
+    """Ubah TypedDict / tipe dasar menjadi `responseSchema` REST (OpenAPI)."""
+    if tp in _SCALARS:
+        return {"type": _SCALARS[tp]}
+    if typing.get_origin(tp) is list:
+        (item,) = typing.get_args(tp)
+        return {"type": "ARRAY", "items": to_response_schema(item)}
+    if is_typeddict(tp):
+        hints = get_type_hints(tp)
+        return {
+            "type": "OBJECT",
+            "properties": {k: to_response_schema(v) for k, v in hints.items()},
+            "required": [k for k in hints if k in tp.__required_keys__],
+        }
+    raise TypeError(f"Tipe schema tidak didukung: {tp!r}")
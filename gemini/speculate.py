@@ -0,0 +1,200 @@
+# gemini/speculate.py
+"""
+Ekstraksi spekulatif di background (dipakai app.py).
+
+Halaman mulai diekstrak begitu diunggah / dipilih di carousel, sehingga
+tombol "Process Image" biasanya tinggal mengambil hasil jadi. Pekerjaan
+yang tidak lagi relevan dibatalkan lewat `retain`, dan `budget` membatasi
+jumlah halaman spekulatif agar kuota tidak habis. Pekerjaan yang gagal
+(429, key salah, ...) final untuk kuncinya: tidak dijadwalkan ulang.
+
+`Budget` dan thread pool bisa dibagi antar extractor (mis. semua sesi
+Streamlit dalam satu proses), sehingga batasnya berlaku untuk kuota
+bersama, bukan per objek.
+
+Span metrics tiap pekerjaan dicatat ke `metrics.Run` miliknya sendiri dan
+dikembalikan di `result["spans"]`, jadi breakdown sesi hanya berisi
+halaman yang benar-benar diproses.
+"""
+import hashlib
+import threading
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+
+from gemini import metrics
+from gemini.pipeline import clean_page, render_png
+
+
+class BudgetExhausted(Exception):
+    """Budget halaman spekulatif sudah habis."""
+
+
+class Budget:
+    """
+    Penghitung halaman spekulatif (thread-safe). Bila `parent` diisi,
+    setiap halaman juga ditagihkan ke budget induk (mis. budget sesi di
+    bawah budget bersama satu proses).
+    """
+
+    def __init__(self, limit=10, parent=None):
+        self.limit = limit
+        self.spent = 0
+        self.parent = parent
+        self._lock = threading.Lock()
+
+    @property
+    def remaining(self):
+        own = max(0, self.limit - self.spent)
+        return own if self.parent is None else min(own, self.parent.remaining)
+
+    def charge(self):
+        with self._lock:
+            if self.spent >= self.limit:
+                raise BudgetExhausted(f"speculative budget of {self.limit} pages used")
+            if self.parent is not None:
+                self.parent.charge()
+            self.spent += 1
+
+
+def content_key(data):
+    """Kunci cache dari isi file (bytes)."""
+    return hashlib.sha1(data).hexdigest()
+
+
+class SpeculativeExtractor:
+    """
+    Thread pool kecil + cache hasil per kunci halaman.
+
+    budget      : `Budget` (boleh bersama) atau jumlah maksimal halaman
+                  spekulatif yang benar-benar dijalankan
+    max_workers : halaman paralel (tiap halaman = 3 panggilan model)
+    max_results : hasil selesai yang disimpan (LRU sederhana)
+    pool        : ThreadPoolExecutor bersama; bila None dibuat sendiri
+                  (dan ditutup oleh `shutdown`)
+    """
+
+    def __init__(self, budget=10, max_workers=2, max_results=16, model=None, pool=None):
+        self.budget = budget if isinstance(budget, Budget) else Budget(budget)
+        self.model = model
+        self.max_results = max_results
+        self._own_pool = pool is None
+        self._pool = pool or ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="speculate")
+        self._jobs = {}  # key -> (future, cancel_event)
+        self._lock = threading.Lock()
+
+    @property
+    def remaining(self):
+        return self.budget.remaining
+
+    def submit(self, key, load_image):
+        """
+        Jadwalkan ekstraksi untuk `key` (no-op bila sudah ada). Kegagalan
+        bersifat final: future yang gagal dikembalikan apa adanya, agar
+        rerun tidak terus memanggil API saat kuota habis. Hanya pekerjaan
+        yang ditolak budget (belum memanggil model) boleh dijadwalkan ulang.
+        `load_image` dipanggil di thread worker dan mengembalikan gambar PIL.
+        Span dicatat bila metrics aktif di konteks pemanggil.
+        Mengembalikan future, atau None bila budget habis.
+        """
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None:
+                future = job[0]
+                if not (future.done() and isinstance(future.exception(), BudgetExhausted)):
+                    return future
+                del self._jobs[key]
+            if self.budget.remaining <= 0:
+                return None
+            event = threading.Event()
+            future = self._pool.submit(self._run, load_image, event, metrics.is_enabled())
+            self._jobs[key] = (future, event)
+            self._trim()
+            return future
+
+    def _run(self, load_image, event, record):
+        # budget is charged only when a job actually starts calling the model
+        if event.is_set():
+            raise CancelledError()
+        from gemini.extract import extract
+
+        with metrics.use_run(metrics.Run(enabled=record)) as run:
+            img = load_image()
+            self.budget.charge()
+            raw = {}
+            for name in ("metadata", "monthly", "totals"):
+                if event.is_set():
+                    raise CancelledError()
+                raw[name] = extract(name, img, self.model)
+            metadata, monthly, totals = clean_page(raw)
+            if event.is_set():
+                raise CancelledError()
+            png = render_png(img, metadata, monthly, totals)
+        return {
+            "metadata": metadata, "monthly": monthly, "totals": totals, "png": png,
+            "spans": run.last(),
+        }
+
+    def _trim(self):
+        # drop the oldest finished results beyond max_results
+        done = [k for k, (f, _) in self._jobs.items() if f.done()]
+        for key in done[: max(0, len(done) - self.max_results)]:
+            del self._jobs[key]
+
+    def retain(self, keys):
+        """Batalkan semua pekerjaan yang belum selesai dan tidak ada di `keys`."""
+        keys = set(keys)
+        with self._lock:
+            for key, (future, event) in list(self._jobs.items()):
+                if key in keys or future.done():
+                    continue
+                event.set()
+                future.cancel()
+                del self._jobs[key]
+
+    def result(self, key, timeout=None):
+        """
+        Hasil untuk `key` bila ada (menunggu sampai `timeout` detik bila
+        masih berjalan). Mengembalikan None bila tidak ada / gagal / dibatalkan,
+        atau bila pekerjaannya belum mulai: pekerjaan itu dibatalkan dan
+        pemanggil sebaiknya langsung memakai jalur biasa.
+        """
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is None:
+                return None
+            future, event = job
+            # still queued behind other jobs: faster to run it in the caller
+            if future.cancel():
+                event.set()
+                del self._jobs[key]
+                return None
+        try:
+            return future.result(timeout=timeout)
+        except Exception:
+            return None
+
+    def error(self, key):
+        """Exception pekerjaan `key` yang gagal, atau None."""
+        with self._lock:
+            job = self._jobs.get(key)
+        if job is None or not job[0].done() or job[0].cancelled():
+            return None
+        return job[0].exception()
+
+    def status(self, key):
+        """"none" / "running" / "ready" / "failed"."""
+        with self._lock:
+            job = self._jobs.get(key)
+        if job is None:
+            return "none"
+        future = job[0]
+        if not future.done():
+            return "running"
+        if future.cancelled() or future.exception() is not None:
+            return "failed"
+        return "ready"
+
+    def shutdown(self):
+        """Batalkan pekerjaan yang belum selesai; pool bersama tidak ditutup."""
+        self.retain(())
+        if self._own_pool:
+            self._pool.shutdown(wait=False)
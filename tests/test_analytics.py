@@ -0,0 +1,137 @@
+# tests/test_analytics.py
+"""Statistik NaN-aware di gemini.analytics vs kubus kecil yang dihitung tangan."""
+import math
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from gemini.analytics import (  # noqa: E402
+    StationArchive,
+    annual_totals,
+    anomalies,
+    climatology,
+    coverage,
+    monthly_to_array,
+    rolling_stats,
+)
+
+nan = np.nan
+
+
+def _monthly(year_values):
+    """{year: [12 nilai]} -> monthly JSON bersih ("-" = kosong)."""
+    months = ["January", "February", "March", "April", "May", "June",
+              "July", "August", "September", "October", "November", "December"]
+    return {"rainfall": [
+        {"Year": year, "rainfall": [
+            {"Month": m, "rainfall": "-" if v is None else v} for m, v in zip(months, values)
+        ]}
+        for year, values in year_values.items()
+    ]}
+
+
+def _cube():
+    # 1 station x 3 years x 12 months; January varies, the rest are 1.0
+    data = np.ones((1, 3, 12))
+    data[0, :, 0] = [2.0, nan, 4.0]
+    data[0, 1, 1] = nan
+    return data
+
+
+def test_monthly_to_array_sorts_years_and_marks_missing():
+    years, values = monthly_to_array(_monthly({1891: [None] + [2.0] * 11, 1890: [1.0] * 12}))
+    assert years.tolist() == [1890, 1891]
+    assert values[0].tolist() == [1.0] * 12
+    assert math.isnan(values[1, 0])
+    assert values[1, 1:].tolist() == [2.0] * 11
+
+
+def test_climatology_ignores_nan_and_honours_min_years():
+    clim = climatology(_cube())
+    assert clim[0, 0] == 3.0  # mean(2, 4)
+    assert clim[0, 1] == 1.0
+    assert math.isnan(climatology(_cube(), min_years=3)[0, 0])
+    assert climatology(_cube(), min_years=3)[0, 2] == 1.0
+
+
+def test_anomalies():
+    anom = anomalies(_cube())
+    assert anom[0, 0, 0] == -1.0
+    assert math.isnan(anom[0, 1, 0])
+    assert anom[0, 2, 0] == 1.0
+    assert anom[0, 0, 5] == 0.0
+
+
+def test_annual_totals_min_months():
+    totals = annual_totals(_cube())
+    assert totals[0, 0] == 13.0
+    assert math.isnan(totals[0, 1])  # two months missing
+    assert annual_totals(_cube(), min_months=10)[0, 1] == 10.0
+
+
+def test_rolling_stats_windows():
+    data = np.array([1.0, 2.0, nan, 4.0])
+    stats = rolling_stats(data, window=2, axis=-1)
+    assert stats["count"].tolist() == [2, 1, 1]
+    assert stats["mean"][0] == 1.5
+    assert stats["std"][0] == 0.5
+    assert np.isnan(stats["mean"][1:]).all()  # min_periods defaults to window
+    relaxed = rolling_stats(data, window=2, min_periods=1, axis=-1)
+    assert relaxed["mean"].tolist() == [1.5, 2.0, 4.0]
+
+
+def test_rolling_stats_short_and_invalid_window():
+    assert rolling_stats(np.ones((2, 3, 12)), window=10)["mean"].shape == (2, 0, 12)
+    with pytest.raises(ValueError):
+        rolling_stats(np.ones((2, 3, 12)), window=0)
+
+
+def test_coverage():
+    cov = coverage(_cube())
+    assert cov[0, 0] == pytest.approx(2 / 3)
+    assert cov[0, 2] == 1.0
+    assert coverage(np.empty((0, 0, 12)), axis=1).shape == (0, 12)
+
+
+def test_archive_merges_pages_and_rolls():
+    archive = StationArchive()
+    archive.add_page("A", _monthly({1890: [1.0] * 12, 1891: [None] + [1.0] * 11}))
+    # new values only replace old ones when they are not empty
+    archive.add_page("A", _monthly({1891: [3.0] + [None] * 11}))
+    archive.add_page("B", _monthly({1892: [2.0] * 12}))
+    stations, years, data = archive.cube()
+    assert stations == ("A", "B")
+    assert years.tolist() == [1890, 1891, 1892]
+    assert data[0, 1, 0] == 3.0 and data[0, 1, 1] == 1.0
+    assert np.isnan(data[1, :2]).all()
+
+    rolling = archive.rolling(window=2, min_periods=1, annual=True)
+    assert rolling["end_years"].tolist() == [1891, 1892]
+    assert rolling["mean"][0].tolist() == [13.0, 14.0]  # totals 12, 14, missing
+    assert archive.coverage()["overall"].tolist() == [pytest.approx(2 / 3), pytest.approx(1 / 3)]
+
+
+def test_empty_archive():
+    archive = StationArchive()
+    stations, years, data = archive.cube()
+    assert stations == () and len(years) == 0 and data.shape == (0, 0, 12)
+    cov = archive.coverage()
+    assert cov["overall"].shape == (0,)
+    assert cov["station_month"].shape == (0, 12)
+    assert archive.rolling()["mean"].shape == (0, 0, 12)
+
+
+def test_cached_results_are_read_only_and_invalidated():
+    archive = StationArchive()
+    archive.add_page("A", _monthly({1890: [1.0] * 12}))
+    clim = archive.climatology()
+    with pytest.raises(ValueError):
+        clim[0, 0] = 5.0
+    cov = archive.coverage()
+    cov["overall"] = None  # replacing a key doesn't touch the cache
+    assert archive.coverage()["overall"] is not None
+    assert archive.climatology() is clim
+
+    archive.add_page("A", _monthly({1891: [3.0] * 12}))
+    assert archive.climatology()[0, 0] == 2.0
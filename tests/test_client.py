@@ -0,0 +1,173 @@
+# tests/test_client.py
+"""
+AsyncExtractionClient vs FakeGeminiServer (lokal, tanpa kuota sungguhan).
+
+    python -m pytest tests/
+"""
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from benchmarks.fake_gemini_server import FakeGeminiServer  # noqa: E402
+from gemini.client import (  # noqa: E402
+    AsyncExtractionClient,
+    DeadlineExceeded,
+    ExtractionError,
+    RateLimiter,
+    TokenBucket,
+)
+
+IMAGE = b"\x89PNG fake page"
+PROMPT = "prompt"
+FAST_BACKOFF = {"backoff_base": 0.001, "backoff_cap": 0.01}
+
+
+def _client(server, **kwargs):
+    return AsyncExtractionClient("fake", base_url=server.url, **kwargs)
+
+
+def _generate(server, n=1, limiter=None, **kwargs):
+    """Jalankan `n` panggilan generate paralel; kembalikan daftar hasil."""
+    async def main():
+        async with _client(server, **kwargs) as client:
+            if limiter is not None:
+                client.limiter = limiter
+            return await asyncio.gather(*(client.generate(IMAGE, PROMPT, label="t") for _ in range(n)))
+
+    return asyncio.run(main())
+
+
+def test_retries_429_until_success():
+    with FakeGeminiServer(fail_first=2) as server:
+        (result,) = _generate(server, **FAST_BACKOFF)
+    assert result.retries == 2
+    assert server.stats == {"requests": 3, "ok": 1, "throttled": 2}
+    assert json.loads(result.text)["StationNumber"] == 1234
+
+
+def test_honours_retry_after():
+    with FakeGeminiServer(fail_first=1, retry_after=0.5) as server:
+        (result,) = _generate(server, **FAST_BACKOFF)
+    assert result.retries == 1
+    # backoff alone would be <= 10 ms; the second request waits for Retry-After
+    assert server.arrivals[1] - server.arrivals[0] >= 0.45
+
+
+def test_retries_exhausted():
+    with FakeGeminiServer(error_rate=1.0) as server:
+        with pytest.raises(ExtractionError) as info:
+            _generate(server, max_retries=2, **FAST_BACKOFF)
+    assert not isinstance(info.value, DeadlineExceeded)
+    assert info.value.status == 429
+    assert server.stats["requests"] == 3
+
+
+def test_deadline_exceeded_on_slow_response():
+    with FakeGeminiServer(latency=0.6) as server:
+        with pytest.raises(DeadlineExceeded):
+            _generate(server, deadline=0.2, **FAST_BACKOFF)
+    assert server.stats["requests"] == 1
+
+
+def test_deadline_exceeded_when_retry_after_is_too_long():
+    with FakeGeminiServer(fail_first=1, retry_after=30) as server:
+        t0 = time.monotonic()
+        with pytest.raises(DeadlineExceeded):
+            _generate(server, deadline=1.0, **FAST_BACKOFF)
+    # gives up right away instead of sleeping past the deadline
+    assert time.monotonic() - t0 < 1.0
+    assert server.stats["requests"] == 1
+
+
+def test_rpm_limiter_paces_requests():
+    # 600 rpm = one request per 0.1 s, no burst
+    limiter = RateLimiter()
+    limiter.requests = TokenBucket(600, capacity=1)
+    with FakeGeminiServer() as server:
+        _generate(server, n=5, limiter=limiter)
+    gaps = [b - a for a, b in zip(server.arrivals, server.arrivals[1:])]
+    assert len(gaps) == 4
+    assert min(gaps) >= 0.09
+
+
+def test_tpm_limiter_paces_requests():
+    # 60k tpm = 1000 tokens/s; the fake server bills >= 300 prompt tokens per
+    # request, so after settle() each further request still waits >= 0.3 s
+    limiter = RateLimiter()
+    limiter.tokens = TokenBucket(60000, capacity=800)
+    with FakeGeminiServer() as server:
+        _generate(server, n=3, limiter=limiter, output_tokens=500)
+    assert server.stats["ok"] == 3
+    assert server.arrivals[-1] - server.arrivals[0] >= 0.9 * 2 * 300 / 1000
+
+
+def test_extract_all_returns_three_extractions():
+    async def main():
+        async with _client(server) as client:
+            return await client.extract_all(IMAGE)
+
+    with FakeGeminiServer() as server:
+        raw = asyncio.run(main())
+    assert set(raw) == {"metadata", "monthly", "totals"}
+    assert len(json.loads(raw["monthly"])["rainfall"]) == 10
+    assert len(json.loads(raw["totals"])["Totals"]) == 10
+
+
+class _HtmlHandler(BaseHTTPRequestHandler):
+    """200 dengan body HTML (mis. halaman proxy / captive portal)."""
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        body = b"<html>not json</html>"
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def test_non_json_200_raises_extraction_error():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _HtmlHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    host, port = httpd.server_address[:2]
+
+    async def main():
+        async with AsyncExtractionClient("fake", base_url=f"http://{host}:{port}") as client:
+            return await client.generate(IMAGE, PROMPT)
+
+    try:
+        with pytest.raises(ExtractionError) as info:
+            asyncio.run(main())
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+    assert info.value.status == 200
+
+
+def test_cli_extract_uses_async_client(tmp_path):
+    Image = pytest.importorskip("PIL.Image")
+    from gemini.cli import main
+
+    paths = []
+    for i in range(3):
+        path = tmp_path / f"page{i}.png"
+        Image.new("RGB", (60, 40), "white").save(path)
+        paths.append(str(path))
+    out = tmp_path / "out"
+    with FakeGeminiServer(fail_first=1) as server:
+        status = main(["extract", *paths, "-o", str(out), "--no-plot", "--base-url", server.url])
+    assert status == 0
+    # the first 429 is retried by the client instead of failing a page
+    assert server.stats == {"requests": 10, "ok": 9, "throttled": 1}
+    for i in range(3):
+        monthly = json.loads((out / f"page{i}" / "monthly.json").read_text())
+        assert len(monthly["rainfall"]) == 10
@@ -0,0 +1,112 @@
+# tests/test_export.py
+"""Kontrak format gemini.export: ZIP, CSV lebar dan NetCDF."""
+import csv
+import io
+import json
+import zipfile
+
+import pytest
+
+from gemini import export
+
+MONTHS = ["January", "February", "March", "April", "May", "June",
+          "July", "August", "September", "October", "November", "December"]
+
+
+def _page(name, number, year_values, location="LOC", totals=None):
+    """Page pipeline; `year_values` = {year: [12 nilai / "-"]}."""
+    return {
+        "name": name,
+        "metadata": {"StationNumber": number, "Location": location},
+        "monthly": {"rainfall": [
+            {"Year": year, "rainfall": [{"Month": m, "rainfall": v} for m, v in zip(MONTHS, values)]}
+            for year, values in year_values.items()
+        ]},
+        "totals": {"Totals": [{"Year": y, "Total": t} for y, t in (totals or {}).items()]},
+        "png": b"\x89PNG" + name.encode(),
+    }
+
+
+def _pages():
+    return [
+        _page("A_page1", 9001, {1880: [1.0] * 12}, totals={1880: 12.0}),
+        _page("B_page1", 9002, {1880: [2.0] * 12}, location="B"),
+        # second page of 9001: fills a later decade and one gap of 1880
+        _page("A_page2", 9001, {1880: ["-"] * 11 + [5.0], 1890: [3.0] * 6 + ["-"] * 6}),
+        _page("A_page1", None, {1900: [4.0] * 12}, location="NO NUMBER"),
+    ]
+
+
+def _check_zip(data):
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        assert zf.testzip() is None
+        names = zf.namelist()
+        # folders use page names (duplicates numbered), not station keys
+        assert "A_page1/metadata.json" in names
+        assert "A_page1_2/monthly.json" in names
+        assert "B_page1/rainfall_plot.png" in names
+        assert zf.read("B_page1/rainfall_plot.png") == b"\x89PNGB_page1"
+        assert json.loads(zf.read("A_page2/metadata.json"))["StationNumber"] == 9001
+        assert zf.getinfo("B_page1/rainfall_plot.png").compress_type == zipfile.ZIP_STORED
+        assert len(names) == 4 * 4
+
+
+def test_write_zip_round_trip():
+    _check_zip(export.zip_bytes(_pages()))
+
+
+def test_iter_zip_round_trip_without_seeking():
+    chunks = list(export.iter_zip(iter(_pages())))
+    assert len(chunks) > 1
+    _check_zip(b"".join(chunks))
+
+
+def test_single_page_zip_has_files_at_root():
+    with zipfile.ZipFile(io.BytesIO(export.zip_bytes(_pages()[:1], single=True))) as zf:
+        assert sorted(zf.namelist()) == ["metadata.json", "monthly.json", "rainfall_plot.png", "totals.json"]
+
+
+def test_csv_header_and_rows_merge_per_station_year():
+    rows = list(csv.reader(io.StringIO(export.csv_bytes(_pages()).decode("utf-8"))))
+    assert rows[0] == ["station", "year"] + export.MONTH_ABBR + ["total"]
+    body = {(r[0], r[1]): r[2:] for r in rows[1:]}
+    assert len(body) == len(rows) - 1  # no duplicate (station, year)
+    assert list(body) == [("9001", "1880"), ("9001", "1890"), ("9002", "1880"), ("NO NUMBER", "1900")]
+    # empty values never overwrite; non-empty ones do
+    assert body[("9001", "1880")] == ["1.0"] * 11 + ["5.0", "12.0"]
+    assert body[("9001", "1890")] == ["3.0"] * 6 + [""] * 6 + [""]
+
+
+def test_iter_output_dirs_keys(tmp_path):
+    from gemini.pipeline import write_outputs
+
+    write_outputs(_pages()[0], str(tmp_path / "A_page1"))
+    (page,) = export.iter_output_dirs([str(tmp_path / "A_page1")], keys=("metadata", "monthly"))
+    assert sorted(page) == ["metadata", "monthly", "name"]
+    (page,) = export.iter_output_dirs([str(tmp_path / "A_page1")])
+    assert page["png"] == b"\x89PNGA_page1"
+
+
+def test_netcdf_merges_same_station(tmp_path):
+    netCDF4 = pytest.importorskip("netCDF4")
+    pytest.importorskip("numpy")
+
+    path = str(tmp_path / "batch.nc")
+    pages = _pages()
+    export.write_netcdf(path, iter(pages), years=export.year_range(pages))
+    with netCDF4.Dataset(path) as ds:
+        assert list(ds["station_id"][:]) == ["9001", "9002", "NO NUMBER"]
+        assert len(ds.dimensions["time"]) == (1900 - 1880 + 1) * 12
+        pr = ds["precipitation"][:]
+        assert pr[0, :12].tolist() == [1.0] * 11 + [5.0]
+        assert pr[0, 120:126].tolist() == [3.0] * 6
+        assert pr[0, 126:132].mask.all()
+        assert pr[2, 240:].tolist() == [4.0] * 12
+
+
+def test_netcdf_years_out_of_range(tmp_path):
+    pytest.importorskip("netCDF4")
+    pytest.importorskip("numpy")
+
+    with pytest.raises(ValueError, match="outside the time axis"):
+        export.write_netcdf(str(tmp_path / "bad.nc"), _pages(), years=(1885, 1895))